@@ -33,6 +33,11 @@ class Axy:
         self.ad.options.mode = "plot"
         self.ad.plot_run()
 
+    def plot_svg_file(self, path: str):
+        self.ad.plot_setup(path)
+        self.ad.options.mode = "plot"
+        self.ad.plot_run()
+
     def shutdown(self):
         self.ad.options.mode = "manual"
         self.ad.options.manual_cmd = "disable_xy"
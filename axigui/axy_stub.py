@@ -18,6 +18,9 @@ class Axy:
     def plot_svg(self, svg: str):
         print(f"STUB: plot_svg(str_len={len(svg)})")
 
+    def plot_svg_file(self, path: str):
+        print(f"STUB: plot_svg_file({path})")
+
     def shutdown(self):
         print(f"STUB: shutdown()")
 
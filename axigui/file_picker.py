@@ -0,0 +1,112 @@
+import os
+from typing import Optional
+
+from PySide2.QtCore import QDir, QSettings, QSize, Qt
+from PySide2.QtGui import QIcon
+from PySide2.QtWidgets import (
+    QDialog,
+    QDialogButtonBox,
+    QLabel,
+    QListView,
+    QListWidget,
+    QListWidgetItem,
+    QPushButton,
+    QStyle,
+    QVBoxLayout,
+    QHBoxLayout,
+)
+
+from .preview_cache import PreviewCache
+
+
+class ThumbnailFileDialog(QDialog):
+    """Touch-friendly SVG file picker showing cached thumbnails.
+
+    Folders and files are opened with a single tap. The last folder opened is remembered.
+    """
+
+    def __init__(self, cache: PreviewCache, parent=None):
+        super().__init__(parent)
+
+        self.setWindowTitle("Choose SVG file")
+        self.settings = QSettings()
+        self.settings.beginGroup("file_picker")
+
+        self._cache = cache
+        self._folder = self.settings.value("folder", QDir.homePath())
+        if not os.path.isdir(self._folder):
+            self._folder = QDir.homePath()
+        self.selected_path: Optional[str] = None
+
+        self._folder_label = QLabel()
+        up_btn = QPushButton("UP")
+        up_btn.clicked.connect(lambda: self.set_folder(os.path.dirname(self._folder)))
+        folder_layout = QHBoxLayout()
+        folder_layout.addWidget(up_btn)
+        folder_layout.addWidget(self._folder_label, 1)
+
+        size = PreviewCache.THUMBNAIL_SIZE
+        self._list = QListWidget()
+        self._list.setViewMode(QListView.IconMode)
+        self._list.setIconSize(QSize(size, size))
+        self._list.setGridSize(QSize(size + 32, size + 40))
+        self._list.setResizeMode(QListView.Adjust)
+        self._list.setMovement(QListView.Static)
+        self._list.setWordWrap(True)
+        self._list.itemClicked.connect(self._item_clicked)
+
+        btn_box = QDialogButtonBox()
+        btn_box.setStandardButtons(QDialogButtonBox.Cancel)
+        btn_box.rejected.connect(self.reject)
+
+        layout = QVBoxLayout()
+        layout.addLayout(folder_layout)
+        layout.addWidget(self._list)
+        layout.addWidget(btn_box)
+        self.setLayout(layout)
+        self.resize(900, 600)
+
+        self.set_folder(self._folder)
+
+    def set_folder(self, folder: str):
+        self._folder = folder
+        self.settings.setValue("folder", folder)
+        self._folder_label.setText(folder)
+        self._list.clear()
+
+        try:
+            names = sorted(os.listdir(folder), key=str.lower)
+        except OSError:
+            names = []
+
+        folder_icon = self.style().standardIcon(QStyle.SP_DirIcon)
+        file_icon = self.style().standardIcon(QStyle.SP_FileIcon)
+        for name in names:
+            path = os.path.join(folder, name)
+            if name.startswith("."):
+                continue
+            if os.path.isdir(path):
+                item = QListWidgetItem(folder_icon, name)
+            elif name.lower().endswith(".svg"):
+                thumbnail = self._cache.thumbnail(path)
+                icon = file_icon if thumbnail is None else QIcon(thumbnail)
+                item = QListWidgetItem(icon, name)
+            else:
+                continue
+            item.setData(Qt.UserRole + 1, path)
+            self._list.addItem(item)
+
+    def _item_clicked(self, item: QListWidgetItem):
+        path = item.data(Qt.UserRole + 1)
+        if os.path.isdir(path):
+            self.set_folder(path)
+        else:
+            self.selected_path = path
+            self.accept()
+
+    @classmethod
+    def get_open_file_name(cls, cache: PreviewCache, parent=None) -> Optional[str]:
+        dialog = cls(cache, parent)
+        if dialog.exec_() == QDialog.Accepted:
+            return dialog.selected_path
+        return None
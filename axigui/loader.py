@@ -0,0 +1,77 @@
+import vpype
+from PySide2.QtCore import QThread, Signal
+
+from .pipeline import PackedVectorData
+from .svg_stream import iter_svg_batches
+
+
+class SvgLoader(QThread):
+    """Load a SVG file in a background thread, with ``vpype.read_multilayer_svg()``.
+
+    The ``loaded`` signal is emitted with the loader itself once done, the resulting vector
+    data being kept in the ``vector_data`` attribute, so that a caller may also ``wait()`` for
+    the thread and use it directly. Nothing is emitted if an interruption was requested. If the
+    file cannot be read, ``failed`` is emitted with the loader and the error message instead.
+
+    When ``pack`` is set, large vector data is also packed with its bounds computed in the
+    thread, the packed geometry being kept in the ``packed`` attribute and replacing the
+    original one in ``vector_data``.
+    """
+
+    loaded = Signal(object)
+    failed = Signal(object, str)
+
+    def __init__(self, path: str, quantization: float, parent=None, pack: bool = False):
+        super().__init__(parent)
+        self.path = path
+        self.quantization = quantization
+        self.pack = pack
+        self.vector_data = None
+        self.packed = None
+
+    def run(self):
+        try:
+            vector_data = vpype.read_multilayer_svg(self.path, self.quantization)
+            if self.pack and not self.isInterruptionRequested():
+                self.packed = PackedVectorData.create(vector_data)
+            if self.packed is not None:
+                self.packed.bounds()
+                vector_data = self.packed.vector_data()
+            self.vector_data = vector_data
+        except Exception as e:
+            self.failed.emit(self, str(e) or type(e).__name__)
+            return
+        if not self.isInterruptionRequested():
+            self.loaded.emit(self)
+        elif self.packed is not None:
+            self.packed.close()
+
+
+class SvgStreamLoader(QThread):
+    """Incrementally load a SVG file in a background thread, with ``iter_svg_batches()``.
+
+    ``batch_loaded`` is emitted with the loader itself, a layer ID and a batch of lines as soon
+    as they are parsed, and ``streamed`` is emitted with the loader once the whole file is
+    loaded. Loading stops when an interruption is requested. If the file cannot be read,
+    ``failed`` is emitted with the loader and the error message instead of ``streamed``.
+    """
+
+    batch_loaded = Signal(object, int, object)
+    streamed = Signal(object)
+    failed = Signal(object, str)
+
+    def __init__(self, path: str, quantization: float, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.quantization = quantization
+
+    def run(self):
+        try:
+            for layer_id, lines in iter_svg_batches(self.path, self.quantization):
+                if self.isInterruptionRequested():
+                    return
+                self.batch_loaded.emit(self, layer_id, lines)
+        except Exception as e:
+            self.failed.emit(self, str(e) or type(e).__name__)
+        else:
+            self.streamed.emit(self)
@@ -1,11 +1,14 @@
-import copy
+import cmath
+import functools
 import io
 import math
+import os
 import sys
-from typing import Tuple
+import tempfile
+from typing import Tuple, Optional, Set, List, Iterator, Iterable, Dict, Sequence
 
 import vpype
-from PySide2.QtCore import QSettings, QSize, QCoreApplication, Qt
+from PySide2.QtCore import QSettings, QSize, QCoreApplication, Qt, QTimer, QThread, Signal
 from PySide2.QtGui import (
     QPalette,
     QColor,
@@ -29,12 +32,19 @@ from PySide2.QtWidgets import (
     QCheckBox,
     QDoubleSpinBox,
     QListView,
-    QFileDialog,
+    QLabel,
+    QSpinBox,
+    QMessageBox,
 )
 
 from .axy import axy
 from .config_dialog import ConfigDialog, AxySettingsSpinBox
-from .utils import UnitComboBox
+from .file_picker import ThumbnailFileDialog
+from .loader import SvgLoader, SvgStreamLoader
+from .pipeline import PackedVectorData
+from .plot_worker import PlotWorker
+from .preview_cache import PreviewCache
+from .utils import UnitComboBox, memory_usage, geometry_size, format_size
 from .vector_data_plot_widget import VectorDataPlotWidget
 
 
@@ -53,7 +63,169 @@ PAGE_FORMATS = {
 }
 
 
+def _transform_vector_data(
+    vector_data: vpype.VectorData, a: complex, b: complex
+) -> vpype.VectorData:
+    """Apply the ``z -> a * z + b`` transform to a vector data, returning a new instance.
+
+    The input is never modified. When the transform is the identity, the input is returned
+    as is, so the geometry is only copied when it actually changes.
+    """
+    if a == 1 and b == 0:
+        return vector_data
+
+    vd = vpype.VectorData()
+    for lid, lc in vector_data.layers.items():
+        vd.add(vpype.LineCollection([line * a + b for line in lc]), lid)
+    return vd
+
+
+@functools.lru_cache(maxsize=None)
+def _color_icon(color: Tuple[float, float, float]) -> QIcon:
+    pixmap = QPixmap(16, 12)
+    pixmap.fill(QColor(*[c * 255 for c in color]))
+    return QIcon(pixmap)
+
+
+def _iter_plot_lines(
+    lc: Sequence,
+    skipped: Set[int],
+    instances: List[Tuple[complex, complex]],
+    reversed_instances: Set[int],
+) -> Iterator:
+    """Expand the instances of a layer one line at a time, in plotting order.
+
+    Instances whose index is in ``reversed_instances`` are plotted backward, i.e. with their
+    lines in reverse order and each line reversed.
+    """
+    for k, (a, b) in enumerate(instances):
+        backward = k in reversed_instances
+        for i in range(len(lc) - 1, -1, -1) if backward else range(len(lc)):
+            if i not in skipped:
+                line = lc[i][::-1] if backward else lc[i]
+                yield line if a == 1 and b == 0 else line * a + b
+
+
+def _chunk_lines(lines: Iterable, size: int) -> Iterator[List]:
+    """Group lines into lists of about ``size`` vertices, or one line if longer."""
+    chunk = []
+    count = 0
+    for line in lines:
+        chunk.append(line)
+        count += len(line)
+        if count >= size:
+            yield chunk
+            chunk = []
+            count = 0
+    if chunk:
+        yield chunk
+
+
+def _write_svg_lines(fp, lines: Iterable, page_format: Tuple[float, float]):
+    """Write lines (in pixels) as a single layer SVG, one line at a time."""
+    width, height = page_format
+    fp.write(
+        '<?xml version="1.0" encoding="utf-8" ?>\n'
+        '<svg xmlns="http://www.w3.org/2000/svg" '
+        'xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape" '
+        f'width="{width / 96 * 2.54:.8f}cm" height="{height / 96 * 2.54:.8f}cm" '
+        f'viewBox="0 0 {width} {height}">\n'
+        '<g fill="none" id="layer1" inkscape:groupmode="layer" inkscape:label="1" '
+        'stroke="black" style="display:inline">\n'
+    )
+    for line in lines:
+        points = " ".join(f"{z.real:.3f},{z.imag:.3f}" for z in line)
+        fp.write(f'<polyline points="{points}"/>\n')
+    fp.write("</g>\n</svg>\n")
+
+
+def _write_plot_svg(lines: Iterable, page_format: Tuple[float, float], to_file: bool) -> str:
+    """Serialize lines for plotting, without keeping them in memory.
+
+    Returns the SVG text, or the path to a temporary file containing it if ``to_file`` is set.
+    """
+    if to_file:
+        fd, path = tempfile.mkstemp(suffix=".svg")
+        try:
+            with os.fdopen(fd, "w") as fp:
+                _write_svg_lines(fp, lines, page_format)
+        except Exception:
+            os.remove(path)
+            raise
+        return path
+    else:
+        svg = io.StringIO()
+        _write_svg_lines(svg, lines, page_format)
+        return svg.getvalue()
+
+
+def _plot_svg(svg: str, from_file: bool):
+    if from_file:
+        try:
+            axy.plot_svg_file(svg)
+        finally:
+            os.remove(svg)
+    else:
+        axy.plot_svg(svg)
+
+
+def _compose(
+    t1: Tuple[complex, complex], t2: Tuple[complex, complex]
+) -> Tuple[complex, complex]:
+    """Compose two ``(a, b)`` transforms, ``t2`` being applied first."""
+    return t1[0] * t2[0], t1[0] * t2[1] + t1[1]
+
+
+def _inverse(t: Tuple[complex, complex]) -> Tuple[complex, complex]:
+    return 1 / t[0], -t[1] / t[0]
+
+
+def _imposition_transforms(
+    bounds: Tuple[float, float, float, float],
+    rows: int,
+    cols: int,
+    spacing: float,
+    rotation: float,
+) -> List[Tuple[complex, complex]]:
+    """Compute the transforms of ``rows`` x ``cols`` copies of a drawing, in plotting order.
+
+    Copies are rotated by ``rotation`` degrees around their center and laid out on a grid
+    with ``spacing`` between them, in the drawing's coordinates. Rows are alternately run
+    forward and backward to limit pen-up travel.
+    """
+    # rotation around the center
+    min_x, min_y, max_x, max_y = bounds
+    center = complex(min_x + max_x, min_y + max_y) / 2
+    a = cmath.rect(1, math.radians(rotation)) if rotation else 1
+    b = center - a * center
+
+    # move back the rotated copy to the original top-left corner
+    corners = [a * complex(x, y) + b for x in bounds[0::2] for y in bounds[1::2]]
+    tile_min = complex(min(c.real for c in corners), min(c.imag for c in corners))
+    tile_max = complex(max(c.real for c in corners), max(c.imag for c in corners))
+    b += complex(min_x, min_y) - tile_min
+
+    step = tile_max - tile_min + complex(spacing, spacing)
+    transforms = []
+    for row in range(rows):
+        for col in range(cols) if row % 2 == 0 else reversed(range(cols)):
+            transforms.append((a, b + complex(col * step.real, row * step.imag)))
+    return transforms
+
+
 class PlotControlWidget(QWidget):
+    # emitted with True when a plot starts and False when it ends
+    plotting_changed = Signal(bool)
+
+    # the preview is first loaded with a quantization this much coarser than the plot's
+    COARSE_FACTOR = 20.0
+
+    # delay before refining after the tolerance is changed, in ms
+    REFINE_DELAY = 500
+
+    # number of vertices plotted at once, i.e. between progress updates
+    PLOT_CHUNK_SIZE = 20000
+
     # noinspection PyTypeChecker
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -64,6 +236,18 @@ class PlotControlWidget(QWidget):
 
         self.base_vector_data = vpype.VectorData()
         self.vector_data: vpype.VectorData = None
+        self._base_bounds: Optional[Tuple[float, float, float, float]] = None
+        self._packed: Optional[PackedVectorData] = None
+        self._plot_worker: Optional[PlotWorker] = None
+
+        # current job
+        self.path: Optional[str] = None
+        self.job_quantization: Optional[float] = None
+        self._loaders: Set[QThread] = set()
+        self._stream_loader: Optional[SvgStreamLoader] = None
+        self._refine_loader: Optional[SvgLoader] = None
+        self._stream_vector_data: Optional[vpype.VectorData] = None
+        self.preview_cache = PreviewCache()
 
         # settings
         self.page_format: str = self.settings.value("page_format", "A4")
@@ -74,10 +258,30 @@ class PlotControlWidget(QWidget):
         self.fit_page: bool = self.settings.value("fit_page", False)
         self.margin_value: float = self.settings.value("margin_value", 2.0)
         self.margin_unit: str = self.settings.value("margin_unit", "cm")
+        self.low_memory: bool = self.settings.value("low_memory", False)
+        self.multi_layer: bool = self.settings.value("multi_layer", False)
+        self.quantization = float(self.settings.value("quantization", 0.05))
+        self.impose_rows: int = int(self.settings.value("impose_rows", 1))
+        self.impose_cols: int = int(self.settings.value("impose_cols", 1))
+        self.impose_spacing_value = float(self.settings.value("impose_spacing_value", 0.0))
+        self.impose_spacing_unit: str = self.settings.value("impose_spacing_unit", "cm")
+        self.impose_rotation: int = int(self.settings.value("impose_rotation", 0))
+
+        # copies of the vector data on the page, as (a, b) transforms relative to the first
+        # copy, in plotting order
+        self.instances: List[Tuple[complex, complex]] = [(1, 0)]
+
+        # indices of the copies on backward rows, which are plotted backward as well
+        self.reversed_instances: Set[int] = set()
+
+        # layout transform of the first copy, when it is not applied to vector_data itself
+        self.transform: Tuple[complex, complex] = (1, 0)
+        self._geometry_size = 0
 
         # setup plot area
         self.plot = VectorDataPlotWidget()
         self.plot.setSizePolicy(QSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding))
+        self.plot.low_memory = self.low_memory
 
         # page layout controls
         page_box = QGroupBox("Page layout")
@@ -116,12 +320,54 @@ class PlotControlWidget(QWidget):
         )
         margin_layout.addWidget(margin_spin)
         margin_layout.addWidget(margin_unit)
+        impose_layout = QHBoxLayout()
+        impose_rows_spin = QSpinBox()
+        impose_rows_spin.setRange(1, 50)
+        impose_rows_spin.setPrefix("rows: ")
+        impose_rows_spin.setValue(self.impose_rows)
+        impose_cols_spin = QSpinBox()
+        impose_cols_spin.setRange(1, 50)
+        impose_cols_spin.setPrefix("cols: ")
+        impose_cols_spin.setValue(self.impose_cols)
+        impose_layout.addWidget(impose_rows_spin)
+        impose_layout.addWidget(impose_cols_spin)
+        impose_spacing_layout = QHBoxLayout()
+        impose_spacing_spin = QDoubleSpinBox()
+        impose_spacing_spin.setValue(self.impose_spacing_value)
+        impose_spacing_unit = UnitComboBox()
+        impose_spacing_unit.setCurrentText(self.impose_spacing_unit)
+        impose_spacing_layout.addWidget(impose_spacing_spin)
+        impose_spacing_layout.addWidget(impose_spacing_unit)
+        impose_rotation_spin = QSpinBox()
+        impose_rotation_spin.setRange(-180, 180)
+        impose_rotation_spin.setSingleStep(90)
+        impose_rotation_spin.setSuffix("°")
+        impose_rotation_spin.setValue(self.impose_rotation)
+
+        def update_imposition():
+            self.set_imposition(
+                impose_rows_spin.value(),
+                impose_cols_spin.value(),
+                impose_spacing_spin.value(),
+                impose_spacing_unit.currentText(),
+                impose_rotation_spin.value(),
+            )
+
+        impose_rows_spin.valueChanged.connect(update_imposition)
+        impose_cols_spin.valueChanged.connect(update_imposition)
+        impose_spacing_spin.valueChanged.connect(update_imposition)
+        impose_spacing_unit.currentTextChanged.connect(update_imposition)
+        impose_rotation_spin.valueChanged.connect(update_imposition)
+
         page_layout.addRow("Page format:", page_format_combo)
         page_layout.addRow("", landscape_check)
         page_layout.addRow("", rotated_check)
         page_layout.addRow("", center_check)
         page_layout.addRow("", fit_page_check)
         page_layout.addRow("Margin:", margin_layout)
+        page_layout.addRow("Copies:", impose_layout)
+        page_layout.addRow("Spacing:", impose_spacing_layout)
+        page_layout.addRow("Rotation:", impose_rotation_spin)
         page_box.setLayout(page_layout)
 
         # Action buttons
@@ -139,16 +385,73 @@ class PlotControlWidget(QWidget):
         pen_down_layout.addWidget(pen_down_btn)
         shutdown_btn = QPushButton("OFF")
         shutdown_btn.clicked.connect(lambda: axy.shutdown())
+
+        # controls commanding the AxiDraw directly, which must not interleave with a plot
+        self._manual_controls = [
+            pen_up_btn,
+            pen_down_btn,
+            pen_up_spin,
+            pen_down_spin,
+            shutdown_btn,
+        ]
+        skip_btn = QPushButton("SKIP")
+        skip_btn.setToolTip("Exclude the selected paths from the plot, in every copy")
+        skip_btn.clicked.connect(lambda: self.plot.skip_selection())
+        self._skip_btn = skip_btn
+        restore_btn = QPushButton("RESTORE")
+        restore_btn.clicked.connect(lambda: self.plot.restore_skipped())
+        paths_layout = QHBoxLayout()
+        paths_layout.addWidget(skip_btn)
+        paths_layout.addWidget(restore_btn)
+        multi_layer_check = QCheckBox("Pen change between layers")
+        multi_layer_check.setChecked(self.multi_layer)
+        multi_layer_check.stateChanged.connect(
+            lambda: self.set_multi_layer(multi_layer_check.isChecked())
+        )
         plot_btn = QPushButton("PLOT")
         plot_btn.clicked.connect(lambda: self.plot_svg())
         action_box = QGroupBox("Actions")
+        quantization_spin = QDoubleSpinBox()
+        quantization_spin.setDecimals(3)
+        quantization_spin.setRange(0.001, 10.0)
+        quantization_spin.setSingleStep(0.01)
+        quantization_spin.setSuffix(" px")
+        quantization_spin.setValue(self.quantization)
+        quantization_spin.valueChanged.connect(
+            lambda: self.set_quantization(quantization_spin.value())
+        )
         action_layout = QFormLayout()
         action_layout.addRow("Pen up: ", pen_up_layout)
         action_layout.addRow("Pen down: ", pen_down_layout)
         action_layout.addRow("Motor off:", shutdown_btn)
+        action_layout.addRow("Selected paths:", paths_layout)
+        action_layout.addRow("Tolerance:", quantization_spin)
+        action_layout.addRow("", multi_layer_check)
         action_layout.addRow("Plot:", plot_btn)
         action_box.setLayout(action_layout)
 
+        # memory controls
+        memory_box = QGroupBox("Memory")
+        memory_layout = QFormLayout()
+        low_memory_check = QCheckBox("Low memory mode")
+        low_memory_check.setChecked(self.low_memory)
+        low_memory_check.stateChanged.connect(
+            lambda: self.set_low_memory(low_memory_check.isChecked())
+        )
+        self.memory_label = QLabel()
+        memory_layout.addRow("", low_memory_check)
+        memory_layout.addRow("Usage:", self.memory_label)
+        memory_box.setLayout(memory_layout)
+        # refine once the tolerance stops changing, e.g. while stepping the spin box
+        self._refine_timer = QTimer(self)
+        self._refine_timer.setSingleShot(True)
+        self._refine_timer.setInterval(self.REFINE_DELAY)
+        self._refine_timer.timeout.connect(self.refine)
+
+        self._memory_timer = QTimer(self)
+        self._memory_timer.timeout.connect(lambda: self.update_memory_label())
+        self._memory_timer.start(2000)
+
         self.list = QListView()
         self.list.setFixedHeight(120)
         self.list.setSizePolicy(QSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred))
@@ -158,6 +461,7 @@ class PlotControlWidget(QWidget):
         controls_layout.addWidget(self.list)
         controls_layout.addWidget(page_box)
         controls_layout.addWidget(action_box)
+        controls_layout.addWidget(memory_box)
         controls_layout.addItem(
             QSpacerItem(20, 40, QSizePolicy.Minimum, QSizePolicy.Expanding)
         )
@@ -204,26 +508,340 @@ class PlotControlWidget(QWidget):
             lambda checked: setattr(self.plot, "show_axes", checked)
         )
 
+        lasso_act = toolbar.addAction(QIcon("images/icons_lasso.png"), "Lasso")
+        lasso_act.setCheckable(True)
+        lasso_act.setChecked(self.plot.lasso_mode)
+        lasso_act.triggered.connect(lambda checked: setattr(self.plot, "lasso_mode", checked))
+
         scale = UnitComboBox()
         scale.setCurrentText(self.plot.unit)
         scale.currentTextChanged.connect(lambda text: setattr(self.plot, "unit", text))
         toolbar.addWidget(scale)
 
     def load_svg(self, path: str):
-        # TODO: make quantization a parameters
-        vd = vpype.read_multilayer_svg(path, 0.05)
+        # a coarse version is streamed to the preview, then refined in the background
+        self._stop_loaders()
+        self.path = path
+        self.job_quantization = None
+        self.plot.clear_progress()
+        self.set_vector_data(vpype.VectorData())
+
+        # show the last rendering of this file, if any, until the scene is rebuilt
+        pixmap = self.preview_cache.get(PreviewCache.key(path, self.preview_options()))
+        if pixmap is not None:
+            self.plot.show_cached_preview(pixmap)
+
+        self._stream_vector_data = vpype.VectorData()
+        loader = SvgStreamLoader(path, self.quantization * self.COARSE_FACTOR, self)
+        loader.batch_loaded.connect(self._append_streamed_lines)
+        loader.streamed.connect(self._set_streamed_vector_data)
+        loader.failed.connect(self._on_stream_failed)
+        self._stream_loader = loader
+        self._start_loader(loader)
+
+    def _append_streamed_lines(
+        self, loader: SvgStreamLoader, layer_id: int, lines: vpype.LineCollection
+    ):
+        if loader is not self._stream_loader:
+            return
+        self._stream_vector_data.add(lines, layer_id)
+        self.plot.append_lines(layer_id, lines)
+
+    def _set_streamed_vector_data(self, loader: SvgStreamLoader):
+        if loader is not self._stream_loader:
+            return
+        self._stream_loader = None
+
+        # the page layout can only be applied once the whole file is loaded
+        vd = self._stream_vector_data
+        self._stream_vector_data = None
         self.set_vector_data(vd)
+        self.plot.hide_cached_preview()
+        self.refine()
+
+    def _on_stream_failed(self, loader: SvgStreamLoader, message: str):
+        if loader is not self._stream_loader:
+            return
+        self._stream_loader = None
+        self._stream_vector_data = None
+
+        # drop the partial preview, there is nothing to plot
+        self.path = None
+        self.set_vector_data(vpype.VectorData())
+        self.plot.hide_cached_preview()
+        QMessageBox.critical(self, "Load error", f"Cannot load {loader.path}: {message}")
+
+    def _stop_loaders(self):
+        """Interrupt loaders, whose results are dropped."""
+        self._refine_timer.stop()
+        for loader in (self._stream_loader, self._refine_loader):
+            if loader is not None:
+                loader.requestInterruption()
+        self._stream_loader = None
+        self._refine_loader = None
+
+    def _start_loader(self, loader: QThread):
+        loader.finished.connect(lambda: self._loaders.discard(loader))
+        loader.finished.connect(loader.deleteLater)
+        self._loaders.add(loader)
+        loader.start()
+
+    def refine(self):
+        """Load the current file with the plot quantization in the background.
+
+        A refinement still in progress is outdated and its result is dropped.
+        """
+        self._refine_timer.stop()
+        if self._refine_loader is not None:
+            self._refine_loader.requestInterruption()
+            self._refine_loader = None
+        if self.path is None or self._stream_loader is not None:
+            return
+
+        loader = SvgLoader(self.path, self.quantization, self, pack=not self.low_memory)
+        loader.loaded.connect(self._on_refined)
+        loader.failed.connect(self._on_refine_failed)
+        self._refine_loader = loader
+        self._start_loader(loader)
+
+    def _on_refined(self, loader: SvgLoader):
+        if loader is self._refine_loader:
+            self._refine_loader = None
+            self._set_refined_vector_data(
+                loader.path, loader.quantization, loader.vector_data, loader.packed
+            )
+
+    def _on_refine_failed(self, loader: SvgLoader, message: str):
+        if loader is self._refine_loader:
+            self._refine_loader = None
+            QMessageBox.critical(self, "Load error", f"Cannot load {loader.path}: {message}")
+
+    def ensure_refined(self) -> bool:
+        """Make sure the plot quality geometry is loaded, waiting for it if needed.
+
+        Returns False, after reporting the error, if the file cannot be read.
+        """
+        self._refine_timer.stop()
+        if self.path is None or self.job_quantization == self.quantization:
+            return True
+
+        # the coarse version being streamed is not needed anymore
+        if self._stream_loader is not None:
+            self._stream_loader.requestInterruption()
+            self._stream_loader = None
+            self._stream_vector_data = None
+
+        vd = packed = None
+        loader = self._refine_loader
+        if (
+            loader is not None
+            and loader.path == self.path
+            and loader.quantization == self.quantization
+        ):
+            loader.wait()
+            vd, packed = loader.vector_data, loader.packed
+        if loader is not None:
+            # the result of the loader, if any, is used below
+            loader.requestInterruption()
+            self._refine_loader = None
+
+        if vd is None:
+            try:
+                vd = vpype.read_multilayer_svg(self.path, self.quantization)
+            except Exception as e:
+                message = str(e) or type(e).__name__
+                QMessageBox.critical(self, "Load error", f"Cannot load {self.path}: {message}")
+                return False
+        self._set_refined_vector_data(self.path, self.quantization, vd, packed)
+        return True
+
+    def _set_refined_vector_data(
+        self,
+        path: str,
+        quantization: float,
+        vector_data: vpype.VectorData,
+        packed: Optional[PackedVectorData] = None,
+    ):
+        # ignore results which are outdated or already in use
+        if (
+            path != self.path
+            or quantization != self.quantization
+            or quantization == self.job_quantization
+        ):
+            if packed is not None:
+                packed.close()
+            return
+
+        skipped = self.plot.has_skipped()
+        self.job_quantization = quantization
+        self.set_vector_data(vector_data, packed)
+        self.plot.hide_cached_preview()
+        if skipped:
+            QMessageBox.warning(
+                self,
+                "Skipped paths",
+                "The drawing was reloaded with the new tolerance, which restored the skipped "
+                "paths. Skip them again before plotting.",
+            )
+        self.preview_cache.put_preview(path, self.preview_options(), self.plot.grab_preview())
+
+    def preview_options(self) -> dict:
+        """Return the layout and display options, e.g. to identify a cached preview."""
+        return {
+            "page_format": self.page_format,
+            "landscape": self.landscape,
+            "rotated": self.rotated,
+            "center": self.center,
+            "fit_page": self.fit_page,
+            "margin": [self.margin_value, self.margin_unit],
+            "imposition": [
+                self.impose_rows,
+                self.impose_cols,
+                self.impose_spacing_value,
+                self.impose_spacing_unit,
+                self.impose_rotation,
+            ],
+            "quantization": self.quantization,
+            **self.plot.display_options(),
+        }
 
     def plot_svg(self):
-        vd = vpype.VectorData()
-        for lid in self.vector_data.layers:
-            if self.plot.layer_visible(lid):
-                vd.add(self.vector_data.layers[lid], 1)
-        svg = io.StringIO()
-        vpype.write_svg(svg, vd, page_format=self.plot.page_format)
-        axy.plot_svg(svg.getvalue())
+        if self._plot_worker is not None:
+            return
+
+        # refining restores skipped paths, which must then be skipped again
+        skipped = self.plot.has_skipped()
+        if not self.ensure_refined() or skipped != self.plot.has_skipped():
+            return
+        layer_ids = [lid for lid in self.vector_data.layers if self.plot.layer_visible(lid)]
+        if self.multi_layer:
+            self.plot_jobs({lid: [lid] for lid in layer_ids})
+        else:
+            # visible layers are merged in a single job
+            self.plot_jobs({1: layer_ids})
+
+    def plot_jobs(self, jobs: Dict[int, List[int]]):
+        """Plot jobs one at a time, in a background thread, pausing for pen changes.
+
+        ``jobs`` maps job IDs, as shown to the operator, to the layers they are made of. Jobs
+        are prepared from a snapshot of the current job, so that changing the view while
+        plotting has no effect on the plot.
+
+        Jobs are plotted by chunks of about ``PLOT_CHUNK_SIZE`` vertices, since the AxiDraw
+        doesn't report the pen position while plotting, so that progress is displayed as each
+        chunk is completed, at a cost that doesn't depend on the size of the drawing.
+        """
+        page_format = self.plot.page_format
+        low_memory = self.low_memory
+        instances = [_compose(t, self.transform) for t in self.instances]
+        reversed_instances = set(self.reversed_instances)
+        layers = {
+            lid: (self.vector_data.layers[lid], set(self.plot.skipped_lines(lid)))
+            for layer_ids in jobs.values()
+            for lid in layer_ids
+        }
+
+        def job_lines(job_id: int) -> Iterator:
+            for lid in jobs[job_id]:
+                yield from _iter_plot_lines(*layers[lid], instances, reversed_instances)
+
+        def prepare(job_id: int) -> Iterator[Tuple[Optional[str], List]]:
+            for lines in _chunk_lines(job_lines(job_id), self.PLOT_CHUNK_SIZE):
+                # in low memory mode, chunks are written to a file right before being plotted
+                yield None if low_memory else _write_plot_svg(lines, page_format, False), lines
+
+        def plot(chunk: Tuple[Optional[str], List]):
+            svg, lines = chunk
+            if svg is None:
+                svg = _write_plot_svg(lines, page_format, True)
+            _plot_svg(svg, low_memory)
+
+        # a chunk is prepared while the current one is plotted, unless in low memory mode
+        worker = PlotWorker(
+            list(jobs.keys()), prepare, plot, prefetch=not low_memory, parent=self
+        )
+        worker.chunk_finished.connect(
+            lambda job_id, chunk: self.plot.add_progress_lines(chunk[1])
+        )
+        worker.pen_change_requested.connect(self._request_pen_change)
+        worker.failed.connect(
+            lambda message: QMessageBox.critical(self, "Plot error", message)
+        )
+        worker.finished.connect(self._plot_jobs_finished)
+        self._plot_worker = worker
+        self._set_plotting(True)
+        self.plot.begin_progress()
+        worker.start()
+
+    def _set_plotting(self, plotting: bool):
+        for widget in self._manual_controls:
+            widget.setEnabled(not plotting)
+        self.plotting_changed.emit(plotting)
+
+    def _request_pen_change(self, layer_id: int):
+        button = QMessageBox.information(
+            self,
+            "Pen change",
+            f"Change the pen for layer {layer_id}, then press OK to resume plotting.",
+            QMessageBox.Ok | QMessageBox.Cancel,
+        )
+        if button == QMessageBox.Ok:
+            self._plot_worker.resume()
+        else:
+            self._plot_worker.cancel()
 
-    def set_vector_data(self, vector_data: vpype.VectorData):
+    def _plot_jobs_finished(self):
+        self.plot.end_progress()
+        self._plot_worker.deleteLater()
+        self._plot_worker = None
+        self._set_plotting(False)
+
+    def stop(self):
+        """Stop background work, e.g. before quitting.
+
+        A chunk being plotted is finished first, as the AxiDraw cannot be interrupted.
+        """
+        if self._plot_worker is not None:
+            self._plot_worker.cancel()
+            self._plot_worker.wait()
+
+        self._stop_loaders()
+        for loader in list(self._loaders):
+            loader.wait()
+
+        if self._packed is not None:
+            self._packed.close()
+            self._packed = None
+
+    def set_vector_data(
+        self, vector_data: vpype.VectorData, packed: Optional[PackedVectorData] = None
+    ):
+        """Set the geometry to lay out, display and plot.
+
+        ``packed`` may be provided when ``vector_data`` was already packed, e.g. by a loader.
+        """
+        # paths are identified by index, which is only meaningful for the same geometry
+        if vector_data is not self.base_vector_data:
+            self.plot.restore_skipped()
+            self.plot.clear_selection()
+
+        # large multi-layer data is processed per layer in a process pool, the packed geometry
+        # replacing the original one
+        if self._packed is not None:
+            self._packed.close()
+        if packed is not None and self.low_memory:
+            # the views stay valid once the packed data is closed
+            packed.close()
+            packed = None
+        elif packed is None and not self.low_memory:
+            packed = PackedVectorData.create(vector_data)
+            if packed is not None:
+                vector_data = packed.vector_data()
+        self._packed = packed
+        if self._packed is not None:
+            self._base_bounds = self._packed.bounds()
+        else:
+            self._base_bounds = vector_data.bounds()
         self.base_vector_data = vector_data
 
         self.update_view()
@@ -232,9 +850,7 @@ class PlotControlWidget(QWidget):
             item = QStandardItem()
             item.setCheckable(True)
             item.setCheckState(Qt.Checked if self.plot.layer_visible(lid) else Qt.Unchecked)
-            pixmap = QPixmap(16, 12)
-            pixmap.fill(QColor(*[c * 255 for c in self.plot.layer_color(lid)]))
-            item.setIcon(QIcon(pixmap))
+            item.setIcon(_color_icon(tuple(float(c) for c in self.plot.layer_color(lid))))
             item.setText(f"Layer {lid}")
             item.setSelectable(False)
             item.setEditable(False)
@@ -248,6 +864,9 @@ class PlotControlWidget(QWidget):
         )
         self.list.setModel(model)
 
+        # paths skipped on the coarse preview could not be found in the refined geometry
+        self._skip_btn.setEnabled(self.job_quantization is not None)
+
     def set_page_format(self, page_format: str):
         self.page_format = page_format
         self.settings.setValue("page_format", page_format)
@@ -281,45 +900,138 @@ class PlotControlWidget(QWidget):
         if self.fit_page:
             self.update_view()
 
-    def update_view(self):
-        self.vector_data = copy.deepcopy(self.base_vector_data)
+    def set_multi_layer(self, multi_layer: bool):
+        self.multi_layer = multi_layer
+        self.settings.setValue("multi_layer", multi_layer)
+
+    def set_imposition(self, rows: int, cols: int, spacing: float, unit: str, rotation: int):
+        self.impose_rows = rows
+        self.impose_cols = cols
+        self.impose_spacing_value = spacing
+        self.impose_spacing_unit = unit
+        self.impose_rotation = rotation
+        self.settings.setValue("impose_rows", rows)
+        self.settings.setValue("impose_cols", cols)
+        self.settings.setValue("impose_spacing_value", spacing)
+        self.settings.setValue("impose_spacing_unit", unit)
+        self.settings.setValue("impose_rotation", rotation)
+        self.update_view()
+
+    def set_quantization(self, quantization: float):
+        self.quantization = quantization
+        self.settings.setValue("quantization", quantization)
+        self._refine_timer.start()
+
+    def set_low_memory(self, low_memory: bool):
+        self.low_memory = low_memory
+        self.settings.setValue("low_memory", low_memory)
+        self.plot.low_memory = low_memory
+        self.set_vector_data(self.base_vector_data)
 
-        # scale/center according to settings
+    def update_memory_label(self):
+        usage = memory_usage()
+        text = "n/a" if usage is None else format_size(usage)
+        text += f" (geometry: {format_size(self._geometry_size)})"
+        self.memory_label.setText(text)
+
+    def page_size(self) -> Tuple[float, float]:
         width, height = PAGE_FORMATS[str(self.page_format)]
         if self.landscape:
             width, height = height, width
-        if self.rotated:
-            self.vector_data.rotate(-math.pi / 2)
-            self.vector_data.translate(0, height)
+        return width, height
+
+    def imposition_transforms(self) -> List[Tuple[complex, complex]]:
+        """Compute the transforms of each copy of the base vector data, in plotting order."""
+        if self._base_bounds is None:
+            return [(1, 0)]
+
+        return _imposition_transforms(
+            self._base_bounds,
+            self.impose_rows,
+            self.impose_cols,
+            self.impose_spacing_value * vpype.convert(self.impose_spacing_unit),
+            self.impose_rotation,
+        )
+
+    def layout_transform(
+        self, imposition: Optional[List[Tuple[complex, complex]]] = None
+    ) -> Tuple[complex, complex]:
+        """Compute the page layout transform as a ``z -> a * z + b`` pair.
+
+        The layout accounts for all the copies described by ``imposition``, if provided.
+        """
+        width, height = self.page_size()
+
+        # rotate by -90 degrees and move back on the page
+        a, b = (-1j, height * 1j) if self.rotated else (1, 0)
 
-        bounds = self.vector_data.bounds()
+        bounds = self._base_bounds
         if bounds is not None:
-            min_x, min_y, max_x, max_y = bounds
+            corners = [
+                a * (ta * complex(x, y) + tb) + b
+                for ta, tb in imposition or [(1, 0)]
+                for x in bounds[0::2]
+                for y in bounds[1::2]
+            ]
+            min_x = min(c.real for c in corners)
+            min_y = min(c.imag for c in corners)
+            max_x = max(c.real for c in corners)
+            max_y = max(c.imag for c in corners)
             margin = self.margin_value * vpype.convert(self.margin_unit)
             if self.fit_page:
                 factor_x = (width - 2 * margin) / (max_x - min_x)
                 factor_y = (height - 2 * margin) / (max_y - min_y)
                 scale = min(factor_x, factor_y)
 
-                self.vector_data.translate(-min_x, -min_y)
-                self.vector_data.scale(scale)
+                a, b = a * scale, (b - complex(min_x, min_y)) * scale
                 if factor_x < factor_y:
-                    self.vector_data.translate(
+                    b += complex(
                         margin, margin + (height - 2 * margin - (max_y - min_y) * scale) / 2
                     )
                 else:
-                    self.vector_data.translate(
+                    b += complex(
                         margin + (width - 2 * margin - (max_x - min_x) * scale) / 2, margin
                     )
             elif self.center:
-                self.vector_data.translate(
+                b += complex(
                     (width - (max_x - min_x)) / 2 - min_x,
                     (height - (max_y - min_y)) / 2 - min_y,
                 )
 
+        return a, b
+
+    def update_view(self):
+        imposition = self.imposition_transforms()
+        layout = self.layout_transform(imposition)
+        copies = [_compose(layout, t) for t in imposition]
+
+        # In low memory mode, the base geometry is shared and the layout is only applied when
+        # rendering and plotting. Otherwise, the laid out geometry is computed once, which
+        # implies a copy unless the layout is the identity (i.e. not with the default centered
+        # layout). Other copies are only stored as transforms relative to the first one.
+        if self.low_memory:
+            self.vector_data, self.transform = self.base_vector_data, copies[0]
+        elif self._packed is not None and copies[0] != (1, 0):
+            self.vector_data, self.transform = self._packed.transform(*copies[0]), (1, 0)
+        else:
+            self.vector_data = _transform_vector_data(self.base_vector_data, *copies[0])
+            self.transform = (1, 0)
+        inverse = _inverse(copies[0])
+        self.instances = [(1, 0)] + [_compose(t, inverse) for t in copies[1:]]
+        self.reversed_instances = {
+            k for k in range(len(copies)) if (k // self.impose_cols) % 2 == 1
+        }
+        width, height = self.page_size()
+
+        self._geometry_size = geometry_size(self.base_vector_data)
+        if self.vector_data is not self.base_vector_data:
+            self._geometry_size += geometry_size(self.vector_data)
+        self.update_memory_label()
+
         # configure plot widget
-        self.plot.vector_data = self.vector_data
-        self.plot.page_format = (width, height)
+        self.plot.transform = self.transform
+        self.plot.instances = self.instances[1:]
+        self.plot.set_scene(self.vector_data, (width, height))
 
 
 class MainWindow(QWidget):
@@ -337,6 +1049,9 @@ class MainWindow(QWidget):
         load_act.triggered.connect(lambda: self.load_svg())
         config_act = self._toolbar.addAction(QIcon("images/icons_settings.png"), "Config")
         config_act.triggered.connect(lambda: self._config_dialog.exec_())
+        self._plot_control.plotting_changed.connect(
+            lambda plotting: config_act.setEnabled(not plotting)
+        )
         self._toolbar.addSeparator()
         self._plot_control.add_actions(self._toolbar)
         empty = QWidget()
@@ -344,6 +1059,7 @@ class MainWindow(QWidget):
         self._toolbar.addWidget(empty)
         quit_act = self._toolbar.addAction(QIcon("images/icons_exit.png"), "Quit")
         quit_act.triggered.connect(lambda: QCoreApplication.quit())
+        QCoreApplication.instance().aboutToQuit.connect(lambda: self._plot_control.stop())
 
         # setup layout
         layout = QVBoxLayout()
@@ -354,12 +1070,9 @@ class MainWindow(QWidget):
         self.setLayout(layout)
 
     def load_svg(self):
-        # TODO: remember last folder opened in the session
-        path = QFileDialog.getOpenFileName(
-            self, "Choose SVG file:", "/Users/hhip/Drive/axidraw", "SVG (*.svg)"
-        )
-        if path[0]:
-            self._plot_control.load_svg(path[0])
+        path = ThumbnailFileDialog.get_open_file_name(self._plot_control.preview_cache, self)
+        if path:
+            self._plot_control.load_svg(path)
 
 
 def main():
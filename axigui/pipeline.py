@@ -0,0 +1,218 @@
+import ctypes
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+import vpype
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
+# below this number of vertices, the process pool overhead isn't worth it
+MIN_PARALLEL_SIZE = 200000
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    # the pool is also used from loader threads
+    with _executor_lock:
+        if _executor is None:
+            # workers are spawned rather than forked from the (multi-threaded) Qt process
+            _executor = ProcessPoolExecutor(
+                max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+
+def _bounds(vertices: np.ndarray) -> Tuple[float, float, float, float]:
+    return (
+        float(vertices.real.min()),
+        float(vertices.imag.min()),
+        float(vertices.real.max()),
+        float(vertices.imag.max()),
+    )
+
+
+def _transform(src: np.ndarray, dst: np.ndarray, a: complex, b: complex):
+    np.multiply(src, a, out=dst)
+    np.add(dst, b, out=dst)
+
+
+def _bounds_worker(name: str, size: int, start: int, stop: int):
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        vertices = np.ndarray(size, dtype=complex, buffer=shm.buf)[start:stop]
+        bounds = _bounds(vertices)
+        del vertices
+        return bounds
+    finally:
+        shm.close()
+
+
+def _transform_worker(
+    src_name: str, dst_name: str, size: int, a: complex, b: complex, start: int, stop: int
+):
+    src = shared_memory.SharedMemory(name=src_name)
+    dst = shared_memory.SharedMemory(name=dst_name)
+    try:
+        src_vertices = np.ndarray(size, dtype=complex, buffer=src.buf)[start:stop]
+        dst_vertices = np.ndarray(size, dtype=complex, buffer=dst.buf)[start:stop]
+        _transform(src_vertices, dst_vertices, a, b)
+        del src_vertices, dst_vertices
+    finally:
+        src.close()
+        dst.close()
+
+
+class _SharedBlock:
+    """Complex array in a new shared memory block, usable as a numpy array.
+
+    Arrays created from it keep it alive, and the block is released once none is left, so
+    that lines may be views into the block. Worker processes access the block by name until
+    ``unlink()`` is called, which should be done as soon as they don't need it anymore.
+    """
+
+    def __init__(self, size: int):
+        self.shm = shared_memory.SharedMemory(create=True, size=max(size, 1) * 16)
+        self._linked = True
+        address = ctypes.addressof(ctypes.c_char.from_buffer(self.shm.buf))
+        self.__array_interface__ = {
+            "shape": (size,),
+            "typestr": "<c16",
+            "data": (address, False),
+            "version": 3,
+        }
+
+    def unlink(self):
+        if self._linked:
+            self._linked = False
+            self.shm.unlink()
+
+    def __del__(self):
+        self.shm.close()
+        self.unlink()
+
+
+def _line_collection(lines: List[np.ndarray]) -> vpype.LineCollection:
+    """Create a LineCollection from lines without copying them, as ``append()`` would."""
+    lc = vpype.LineCollection()
+    lc.lines.extend(lines)
+    return lc
+
+
+class PackedVectorData:
+    """Vector data packed in a shared memory block, for per-layer processing in a process pool.
+
+    All the vertices are stored contiguously, layer after layer, so that worker processes can
+    access a layer without it being pickled. Results are merged back in layer order, as views
+    into a shared memory block, which is only released once they are no longer used. The
+    packed geometry itself is available the same way with ``vector_data()``, so that it can
+    replace the original geometry instead of duplicating it.
+
+    Only bounds and layout transforms are processed this way. Preview overlays (points and
+    pen-up lines) and the serialization of plot jobs are not. These kernels are bound by memory
+    bandwidth, and splitting the results into per-line views runs in the current process, so
+    the speedup is well below the number of cores.
+
+    When ``parallel`` is not set, layers are processed one after the other in the current
+    process instead, e.g. for comparison.
+    """
+
+    def __init__(self, vector_data: vpype.VectorData, parallel: bool = True):
+        self.parallel = parallel
+        # layer ID, vertex range and vertex range of each line, as lists for fast slicing
+        self._layers: List[Tuple[int, int, int, List[int], List[int]]] = []
+        start = 0
+        for lid, lc in vector_data.layers.items():
+            ends = np.cumsum([len(line) for line in lc], dtype=int) + start
+            stop = int(ends[-1]) if len(ends) > 0 else start
+            starts = [start] + ends[:-1].tolist()
+            self._layers.append((lid, start, stop, starts, ends.tolist()))
+            start = stop
+        self._size = start
+        self._cached_bounds: Optional[Tuple[float, float, float, float]] = None
+
+        self._block: Optional[_SharedBlock] = _SharedBlock(self._size)
+        self._vertices = np.asarray(self._block)
+        for (_, start, stop, _, _), lc in zip(self._layers, vector_data.layers.values()):
+            if stop > start:
+                self._vertices[start:stop] = np.concatenate(list(lc))
+
+    @classmethod
+    def create(cls, vector_data: vpype.VectorData) -> Optional["PackedVectorData"]:
+        """Pack the vector data if it is worth processing it in parallel, or return None.
+
+        Layers are processed inline on single CPU machines, where the pool only adds overhead.
+        """
+        if shared_memory is None or len(vector_data.layers) < 2:
+            return None
+        size = sum(len(line) for lc in vector_data.layers.values() for line in lc)
+        if size < MIN_PARALLEL_SIZE:
+            return None
+        return cls(vector_data, parallel=(os.cpu_count() or 1) > 1)
+
+    def close(self):
+        """Stop using the shared memory block, which is released once no view is left."""
+        if self._block is not None:
+            self._block.unlink()
+        self._block = None
+        self._vertices = None
+
+    def _ranges(self) -> List[Tuple[int, int]]:
+        return [(start, stop) for _, start, stop, _, _ in self._layers if stop > start]
+
+    def _map(self, func: Callable, *args) -> List[Any]:
+        """Call ``func(*args, start, stop)`` for each non-empty layer in the process pool, and
+        return the results."""
+        futures = [_get_executor().submit(func, *args, *r) for r in self._ranges()]
+        return [f.result() for f in futures]
+
+    def _views(self, vertices: np.ndarray) -> vpype.VectorData:
+        vd = vpype.VectorData()
+        for lid, _, _, starts, ends in self._layers:
+            lines = [vertices[start:end] for start, end in zip(starts, ends)]
+            vd.add(_line_collection(lines), lid)
+        return vd
+
+    def vector_data(self) -> vpype.VectorData:
+        """Return the packed geometry, as views into the shared memory block."""
+        return self._views(self._vertices)
+
+    def bounds(self) -> Optional[Tuple[float, float, float, float]]:
+        """Compute the bounds of the vector data, each layer being processed in parallel.
+
+        The result is cached, e.g. so that it can be computed ahead in a loader thread.
+        """
+        if self._cached_bounds is not None or self._size == 0:
+            return self._cached_bounds
+        if self.parallel:
+            layer_bounds = self._map(_bounds_worker, self._block.shm.name, self._size)
+        else:
+            layer_bounds = [_bounds(self._vertices[a:b]) for a, b in self._ranges()]
+        self._cached_bounds = (
+            min(b[0] for b in layer_bounds),
+            min(b[1] for b in layer_bounds),
+            max(b[2] for b in layer_bounds),
+            max(b[3] for b in layer_bounds),
+        )
+        return self._cached_bounds
+
+    def transform(self, a: complex, b: complex) -> vpype.VectorData:
+        """Apply the ``z -> a * z + b`` transform, each layer being processed in parallel."""
+        dst = _SharedBlock(self._size)
+        dst_vertices = np.asarray(dst)
+        if self.parallel:
+            self._map(_transform_worker, self._block.shm.name, dst.shm.name, self._size, a, b)
+        else:
+            for start, stop in self._ranges():
+                _transform(self._vertices[start:stop], dst_vertices[start:stop], a, b)
+        dst.unlink()
+        return self._views(dst_vertices)
@@ -0,0 +1,91 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List
+
+from PySide2.QtCore import QThread, Signal
+
+
+class PlotWorker(QThread):
+    """Plot layers one after the other, pausing for a pen change between them.
+
+    ``prepare`` is called with a layer ID and returns an iterable of chunks, which ``plot`` is
+    called with in turn, so that progress may be reported as each chunk is completed. When
+    ``prefetch`` is set, the next chunk, possibly of the next layer, is prepared in a
+    background thread while the current one is being plotted, so that plotting resumes as soon
+    as the pen is changed.
+
+    After each layer but the last, ``pen_change_requested`` is emitted with the next layer ID
+    and the worker waits until either ``resume()`` or ``cancel()`` is called. Cancelling also
+    stops the worker between chunks. If preparing or plotting a chunk fails, ``failed`` is
+    emitted with the error message and the worker stops.
+    """
+
+    layer_started = Signal(int)
+    layer_finished = Signal(int)
+    chunk_finished = Signal(int, object)
+    pen_change_requested = Signal(int)
+    failed = Signal(str)
+
+    def __init__(
+        self,
+        layer_ids: List[int],
+        prepare: Callable[[int], Iterable[Any]],
+        plot: Callable[[Any], None],
+        prefetch: bool = True,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self._layer_ids = layer_ids
+        self._prepare = prepare
+        self._plot = plot
+        self._prefetch = prefetch
+        self._resume = threading.Event()
+        self._cancelled = False
+
+    def resume(self):
+        self._resume.set()
+
+    def cancel(self):
+        self._cancelled = True
+        self._resume.set()
+
+    def run(self):
+        try:
+            self._run()
+        except Exception as e:
+            self.failed.emit(str(e) or type(e).__name__)
+
+    def _run(self):
+        # chunks of all layers, in order, as (layer_id, chunk)
+        chunks = ((lid, chunk) for lid in self._layer_ids for chunk in self._prepare(lid))
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(next, chunks, None)
+            current = None
+            while True:
+                item = future.result()
+                if item is None:
+                    break
+                lid, chunk = item
+
+                if current is not None and lid != current:
+                    self.layer_finished.emit(current)
+                    self._resume.clear()
+                    self.pen_change_requested.emit(lid)
+                    self._resume.wait()
+                if self._cancelled:
+                    return
+                if lid != current:
+                    current = lid
+                    self.layer_started.emit(lid)
+
+                if self._prefetch:
+                    future = executor.submit(next, chunks, None)
+                self._plot(chunk)
+                self.chunk_finished.emit(lid, chunk)
+                del item, chunk
+                if not self._prefetch:
+                    future = executor.submit(next, chunks, None)
+
+            if current is not None:
+                self.layer_finished.emit(current)
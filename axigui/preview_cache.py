@@ -0,0 +1,120 @@
+import collections
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+from PySide2.QtCore import QStandardPaths, Qt
+from PySide2.QtGui import QPixmap
+
+
+class PreviewCache:
+    """Bounded in-memory and on-disk cache of rendered previews and thumbnails.
+
+    Previews are keyed by file (path, size and modification time) and by the layout and display
+    options used to render them, so that an entry is never reused for another rendering.
+    Thumbnails only depend on the file. The most recently used entries are kept in memory, and
+    all entries are saved as PNG files in the application cache directory, where the oldest
+    are removed once ``max_disk_entries`` is exceeded.
+    """
+
+    THUMBNAIL_SIZE = 128
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        max_memory_entries: int = 16,
+        max_disk_entries: int = 256,
+    ):
+        if directory is None:
+            directory = os.path.join(
+                QStandardPaths.writableLocation(QStandardPaths.CacheLocation), "previews"
+            )
+        self.directory = directory
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: "collections.OrderedDict[str, QPixmap]" = collections.OrderedDict()
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key(path: str, options: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """Compute the cache key of a file rendered with some options.
+
+        Returns None if the file cannot be accessed.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        data = [os.path.abspath(path), stat.st_size, stat.st_mtime_ns, options or {}]
+        return hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+    def _file_path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".png")
+
+    def get(self, key: Optional[str]) -> Optional[QPixmap]:
+        if key is None:
+            return None
+
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+
+        file_path = self._file_path(key)
+        if not os.path.exists(file_path):
+            return None
+        pixmap = QPixmap(file_path)
+        if pixmap.isNull():
+            return None
+
+        # touch the file so that it is evicted last
+        os.utime(file_path)
+        self._remember(key, pixmap)
+        return pixmap
+
+    def put(self, key: Optional[str], pixmap: QPixmap):
+        if key is None or pixmap.isNull():
+            return
+
+        self._remember(key, pixmap)
+        pixmap.save(self._file_path(key), "PNG")
+        self._evict()
+
+    def thumbnail(self, path: str) -> Optional[QPixmap]:
+        return self.get(self.key(path, {"thumbnail": True}))
+
+    def put_preview(self, path: str, options: Dict[str, Any], pixmap: QPixmap):
+        """Store a rendered preview, along with the file's thumbnail."""
+        self.put(self.key(path, options), pixmap)
+        self.put(
+            self.key(path, {"thumbnail": True}),
+            pixmap.scaled(
+                self.THUMBNAIL_SIZE,
+                self.THUMBNAIL_SIZE,
+                Qt.KeepAspectRatio,
+                Qt.SmoothTransformation,
+            ),
+        )
+
+    def _remember(self, key: str, pixmap: QPixmap):
+        self._memory[key] = pixmap
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        try:
+            entries = [
+                os.path.join(self.directory, name)
+                for name in os.listdir(self.directory)
+                if name.endswith(".png")
+            ]
+            if len(entries) <= self.max_disk_entries:
+                return
+            entries.sort(key=os.path.getmtime)
+            for file_path in entries[: len(entries) - self.max_disk_entries]:
+                os.remove(file_path)
+        except OSError:
+            pass
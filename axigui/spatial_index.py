@@ -0,0 +1,157 @@
+import math
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+import vpype
+from matplotlib.path import Path
+
+
+def _distances(lines: List[np.ndarray], p: complex) -> np.ndarray:
+    """Return the distances between point ``p`` and each of some non-empty polylines."""
+    lengths = np.array([len(line) for line in lines])
+    offsets = np.cumsum(lengths) - lengths
+    vertices = np.concatenate(lines)
+
+    # distance to each vertex, replaced by the distance to the segment starting at that
+    # vertex unless it is the last of its polyline
+    dist = np.abs(vertices - p)
+    a = vertices[:-1]
+    d = vertices[1:] - a
+    dd = d.real ** 2 + d.imag ** 2
+    t = np.clip(((p - a) * d.conjugate()).real / np.where(dd > 0, dd, 1), 0, 1)
+    segment = np.ones(len(vertices) - 1, dtype=bool)
+    segment[offsets[1:] - 1] = False
+    dist[:-1] = np.where(segment, np.abs(a + t * d - p), dist[:-1])
+    return np.minimum.reduceat(dist, offsets)
+
+
+class PathIndex:
+    """Packed R-tree over the bounding boxes of the paths of a vector data.
+
+    Paths are identified by ``(layer_id, line_index)`` keys. Bounding boxes are sorted with the
+    Sort-Tile-Recursive method and grouped by ``FANOUT`` into the nodes of each level, so that
+    a query only tests the paths near the queried area, even with many long paths such as
+    hatching. The index only keeps references to the lines, not copies.
+    """
+
+    FANOUT = 16
+
+    # lines are processed by chunks when computing bounding boxes to limit peak memory
+    CHUNK_SIZE = 10000
+
+    def __init__(self, vector_data: vpype.VectorData):
+        layer_ids = []
+        line_indices = []
+        self._lines: List[np.ndarray] = []
+        for lid, lc in vector_data.layers.items():
+            for i, line in enumerate(lc):
+                if len(line) > 0:
+                    layer_ids.append(lid)
+                    line_indices.append(i)
+                    self._lines.append(line)
+        self._layer_ids = np.array(layer_ids, dtype=int)
+        self._line_indices = np.array(line_indices, dtype=int)
+
+        count = len(self._lines)
+        self._bounds = np.empty((4, count))
+        for start in range(0, count, self.CHUNK_SIZE):
+            chunk = self._lines[start : start + self.CHUNK_SIZE]
+            offsets = np.cumsum([0] + [len(line) for line in chunk[:-1]])
+            vertices = np.concatenate(chunk)
+            end = start + len(chunk)
+            self._bounds[0, start:end] = np.minimum.reduceat(vertices.real, offsets)
+            self._bounds[1, start:end] = np.minimum.reduceat(vertices.imag, offsets)
+            self._bounds[2, start:end] = np.maximum.reduceat(vertices.real, offsets)
+            self._bounds[3, start:end] = np.maximum.reduceat(vertices.imag, offsets)
+
+        # sort paths in vertical slices of about sqrt(count / FANOUT) leaves each, then
+        # by y within slices
+        cx = self._bounds[0] + self._bounds[2]
+        cy = self._bounds[1] + self._bounds[3]
+        slice_size = self.FANOUT * max(math.ceil(math.sqrt(count / self.FANOUT)), 1)
+        slices = np.empty(count, dtype=int)
+        slices[np.argsort(cx, kind="stable")] = np.arange(count) // slice_size
+        self._order = np.lexsort((cy, slices))
+
+        # node bounds of each level, from the leaves (i.e. the paths) up to the root
+        self._levels = [self._bounds[:, self._order]]
+        while self._levels[-1].shape[1] > 1:
+            starts = np.arange(0, self._levels[-1].shape[1], self.FANOUT)
+            b = self._levels[-1]
+            self._levels.append(
+                np.array(
+                    [
+                        np.minimum.reduceat(b[0], starts),
+                        np.minimum.reduceat(b[1], starts),
+                        np.maximum.reduceat(b[2], starts),
+                        np.maximum.reduceat(b[3], starts),
+                    ]
+                )
+            )
+
+    def __len__(self):
+        return len(self._lines)
+
+    def _key(self, idx: int) -> Tuple[int, int]:
+        return int(self._layer_ids[idx]), int(self._line_indices[idx])
+
+    def _candidates(self, x0: float, y0: float, x1: float, y1: float) -> np.ndarray:
+        """Return the indices of paths whose bounding box intersects the provided box."""
+        if len(self._lines) == 0:
+            return np.empty(0, dtype=int)
+
+        nodes = np.zeros(1, dtype=int)
+        for level, b in enumerate(reversed(self._levels)):
+            if level > 0:
+                nodes = (nodes[:, np.newaxis] * self.FANOUT + np.arange(self.FANOUT)).ravel()
+                nodes = nodes[nodes < b.shape[1]]
+            b = b[:, nodes]
+            nodes = nodes[(b[0] <= x1) & (b[1] <= y1) & (b[2] >= x0) & (b[3] >= y0)]
+        return np.sort(self._order[nodes])
+
+    def nearest(
+        self,
+        x: float,
+        y: float,
+        radius: float,
+        accept: Optional[Callable[[Tuple[int, int]], bool]] = None,
+    ) -> Optional[Tuple[int, int]]:
+        """Return the key of the path closest to (x, y), if any within radius.
+
+        If provided, ``accept`` is called with the keys of candidate paths and may reject them.
+        """
+        cand = self._candidates(x - radius, y - radius, x + radius, y + radius)
+        if len(cand) == 0:
+            return None
+
+        dist = _distances([self._lines[idx] for idx in cand], complex(x, y))
+        within = np.flatnonzero(dist <= radius)
+        for idx in cand[within[np.argsort(dist[within], kind="stable")]]:
+            if accept is None or accept(self._key(idx)):
+                return self._key(idx)
+        return None
+
+    def inside(
+        self, polygon: np.ndarray, accept: Optional[Callable[[Tuple[int, int]], bool]] = None
+    ) -> List[Tuple[int, int]]:
+        """Return the keys of the paths fully enclosed by a (N, 2) polygon."""
+        polygon = np.asarray(polygon, dtype=float)
+        if len(polygon) < 3:
+            return []
+
+        (x0, y0), (x1, y1) = polygon.min(axis=0), polygon.max(axis=0)
+        cand = self._candidates(x0, y0, x1, y1)
+        b = self._bounds[:, cand]
+        cand = cand[(b[0] >= x0) & (b[1] >= y0) & (b[2] <= x1) & (b[3] <= y1)]
+        if len(cand) == 0:
+            return []
+
+        lines = [self._lines[idx] for idx in cand]
+        offsets = np.cumsum([0] + [len(line) for line in lines[:-1]])
+        vertices = np.concatenate(lines)
+        contained = Path(polygon).contains_points(np.vstack([vertices.real, vertices.imag]).T)
+        enclosed = np.logical_and.reduceat(contained, offsets)
+        keys = [self._key(idx) for idx in cand[enclosed]]
+        if accept is not None:
+            keys = [key for key in keys if accept(key)]
+        return keys
@@ -0,0 +1,573 @@
+import math
+import re
+import time
+import xml.etree.ElementTree as ElementTree
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import vpype
+
+# elements whose content is not drawn
+_SKIPPED_TAGS = {
+    "defs",
+    "clipPath",
+    "mask",
+    "marker",
+    "pattern",
+    "symbol",
+    "metadata",
+    "style",
+}
+
+_INKSCAPE_LABEL = "{http://www.inkscape.org/namespaces/inkscape}label"
+_XLINK_HREF = "{http://www.w3.org/1999/xlink}href"
+
+# maximum nesting of <use> elements, to guard against circular references
+_MAX_USE_DEPTH = 16
+
+# page size used by vpype when the SVG doesn't specify it, in pixels
+DEFAULT_SIZE = (1000.0, 1000.0)
+
+_NUMBER_RE = r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+_TOKEN_RE = re.compile(rf"([MmLlHhVvCcSsQqTtAaZz])|({_NUMBER_RE})")
+_TRANSFORM_RE = re.compile(r"(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)")
+_LENGTH_RE = re.compile(rf"\s*({_NUMBER_RE})\s*([a-z]*|%)\s*$")
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _numbers(text: str) -> List[float]:
+    return [float(v) for v in re.findall(_NUMBER_RE, text or "")]
+
+
+def _length(text: Optional[str], default: float = 0.0) -> float:
+    """Convert a SVG length to pixels, percentages being relative to ``default``."""
+    match = _LENGTH_RE.match(text or "")
+    if match is None:
+        return default
+    value, unit = match.groups()
+    if unit == "%":
+        return float(value) * default / 100
+    try:
+        return float(value) * (vpype.convert(unit) if unit and unit != "px" else 1.0)
+    except ValueError:
+        return float(value)
+
+
+def _parse_transform(text: Optional[str]) -> np.ndarray:
+    """Parse a SVG transform attribute into a 3x3 matrix."""
+    m = np.identity(3)
+    for name, args in _TRANSFORM_RE.findall(text or ""):
+        v = _numbers(args)
+        t = np.identity(3)
+        if name == "matrix" and len(v) == 6:
+            t[0], t[1] = (v[0], v[2], v[4]), (v[1], v[3], v[5])
+        elif name == "translate" and v:
+            t[0, 2], t[1, 2] = v[0], v[1] if len(v) > 1 else 0
+        elif name == "scale" and v:
+            t[0, 0], t[1, 1] = v[0], v[1] if len(v) > 1 else v[0]
+        elif name == "rotate" and v:
+            c, s = math.cos(math.radians(v[0])), math.sin(math.radians(v[0]))
+            cx, cy = (v[1], v[2]) if len(v) > 2 else (0, 0)
+            t[0] = (c, -s, cx - c * cx + s * cy)
+            t[1] = (s, c, cy - s * cx - c * cy)
+        elif name == "skewX" and v:
+            t[0, 1] = math.tan(math.radians(v[0]))
+        elif name == "skewY" and v:
+            t[1, 0] = math.tan(math.radians(v[0]))
+        m = m @ t
+    return m
+
+
+def _translate(x: float, y: float) -> np.ndarray:
+    m = np.identity(3)
+    m[0, 2], m[1, 2] = x, y
+    return m
+
+
+def _apply(m: np.ndarray, line: np.ndarray) -> np.ndarray:
+    return (m[0, 0] * line.real + m[0, 1] * line.imag + m[0, 2]) + 1j * (
+        m[1, 0] * line.real + m[1, 1] * line.imag + m[1, 2]
+    )
+
+
+def _segment_count(length: float, quantization: float) -> int:
+    return min(max(int(math.ceil(length / quantization)), 1), 100000)
+
+
+# curves are sampled at these parameters to measure their length, so that they are flattened
+# into about as many segments as with vpype, which uses arc lengths
+_LENGTH_SAMPLES = np.linspace(0, 1, 17)
+
+
+def _polyline_length(points: np.ndarray) -> float:
+    return float(np.abs(np.diff(points)).sum())
+
+
+def _cubic_points(p0: complex, p1: complex, p2: complex, p3: complex, t: np.ndarray):
+    u = 1 - t
+    return u ** 3 * p0 + 3 * u ** 2 * t * p1 + 3 * u * t ** 2 * p2 + t ** 3 * p3
+
+
+def _cubic(p0: complex, p1: complex, p2: complex, p3: complex, quantization: float):
+    length = _polyline_length(_cubic_points(p0, p1, p2, p3, _LENGTH_SAMPLES))
+    n = _segment_count(length, quantization)
+    return _cubic_points(p0, p1, p2, p3, np.linspace(0, 1, n + 1)[1:])
+
+
+def _quadratic_points(p0: complex, p1: complex, p2: complex, t: np.ndarray):
+    u = 1 - t
+    return u ** 2 * p0 + 2 * u * t * p1 + t ** 2 * p2
+
+
+def _quadratic(p0: complex, p1: complex, p2: complex, quantization: float):
+    length = _polyline_length(_quadratic_points(p0, p1, p2, _LENGTH_SAMPLES))
+    n = _segment_count(length, quantization)
+    return _quadratic_points(p0, p1, p2, np.linspace(0, 1, n + 1)[1:])
+
+
+def _arc(
+    p0: complex,
+    rx: float,
+    ry: float,
+    phi: float,
+    large_arc: bool,
+    sweep: bool,
+    p1: complex,
+    quantization: float,
+):
+    """Flatten an elliptical arc, following the SVG implementation notes (F.6.5)."""
+    rx, ry = abs(rx), abs(ry)
+    if rx == 0 or ry == 0 or p0 == p1:
+        return np.array([p1])
+
+    rot = complex(math.cos(math.radians(phi)), math.sin(math.radians(phi)))
+    d = (p0 - p1) / 2 / rot
+    lam = (d.real / rx) ** 2 + (d.imag / ry) ** 2
+    if lam > 1:
+        rx, ry = rx * math.sqrt(lam), ry * math.sqrt(lam)
+
+    num = rx ** 2 * ry ** 2 - rx ** 2 * d.imag ** 2 - ry ** 2 * d.real ** 2
+    den = rx ** 2 * d.imag ** 2 + ry ** 2 * d.real ** 2
+    coef = math.sqrt(max(num / den, 0)) * (-1 if large_arc == sweep else 1)
+    c = coef * complex(rx * d.imag / ry, -ry * d.real / rx)
+    center = c * rot + (p0 + p1) / 2
+
+    u = complex((d.real - c.real) / rx, (d.imag - c.imag) / ry)
+    v = complex((-d.real - c.real) / rx, (-d.imag - c.imag) / ry)
+    theta = math.atan2(u.imag, u.real)
+    delta = (math.atan2(v.imag, v.real) - theta) % (2 * math.pi)
+    if not sweep:
+        delta -= 2 * math.pi
+
+    n = _segment_count(abs(delta) * math.sqrt((rx ** 2 + ry ** 2) / 2), quantization)
+    angles = theta + np.linspace(0, delta, n + 1)[1:]
+    points = (rx * np.cos(angles) + 1j * ry * np.sin(angles)) * rot + center
+    points[-1] = p1
+    return points
+
+
+class _Tokens:
+    def __init__(self, d: str):
+        self._tokens = [m.group(0) for m in _TOKEN_RE.finditer(d)]
+        self._pos = 0
+
+    def has_number(self) -> bool:
+        return self._pos < len(self._tokens) and not self._tokens[self._pos].isalpha()
+
+    def command(self) -> Optional[str]:
+        if self._pos < len(self._tokens):
+            self._pos += 1
+            return self._tokens[self._pos - 1]
+        return None
+
+    def number(self) -> float:
+        self._pos += 1
+        return float(self._tokens[self._pos - 1])
+
+    def point(self) -> complex:
+        return complex(self.number(), self.number())
+
+    def flag(self) -> bool:
+        # arc flags may be written without separator (e.g. "a1 1 0 01 1 1")
+        token = self._tokens[self._pos].lstrip("+")
+        if len(token) > 1:
+            self._tokens[self._pos] = token[1:]
+        else:
+            self._pos += 1
+        return token[0] == "1"
+
+
+def _parse_path(d: str, quantization: float) -> List[np.ndarray]:
+    """Flatten a SVG path data string into lines, one per sub-path."""
+    tokens = _Tokens(d)
+    lines: List[np.ndarray] = []
+    current: List[np.ndarray] = []
+    pos = start = 0j
+    last_ctrl: Optional[complex] = None
+    last_cmd = ""
+
+    def end_subpath():
+        nonlocal current
+        if len(current) > 0:
+            line = np.concatenate(current)
+            if len(line) > 1:
+                lines.append(line)
+        current = []
+
+    while True:
+        if tokens.has_number() and last_cmd:
+            cmd = last_cmd
+        else:
+            cmd = tokens.command()
+            if cmd is None:
+                break
+        rel = cmd.islower()
+        ref = pos if rel else 0j
+        upper = cmd.upper()
+
+        if upper == "M":
+            end_subpath()
+            pos = start = ref + tokens.point()
+            current = [np.array([pos])]
+            # subsequent coordinate pairs are implicit line-to commands
+            last_cmd = "l" if rel else "L"
+            last_ctrl = None
+            continue
+        elif upper == "Z":
+            if current:
+                current.append(np.array([start]))
+            end_subpath()
+            pos = start
+            last_cmd = ""
+            last_ctrl = None
+            continue
+
+        if not current:
+            current = [np.array([pos])]
+
+        if upper == "L":
+            pos = ref + tokens.point()
+            current.append(np.array([pos]))
+        elif upper == "H":
+            pos = complex((ref.real if rel else 0) + tokens.number(), pos.imag)
+            current.append(np.array([pos]))
+        elif upper == "V":
+            pos = complex(pos.real, (ref.imag if rel else 0) + tokens.number())
+            current.append(np.array([pos]))
+        elif upper in "CS":
+            if upper == "C":
+                c1 = ref + tokens.point()
+            else:
+                c1 = 2 * pos - last_ctrl if last_cmd.upper() in ("C", "S") else pos
+            c2 = ref + tokens.point()
+            end = ref + tokens.point()
+            current.append(_cubic(pos, c1, c2, end, quantization))
+            pos, last_ctrl = end, c2
+        elif upper in "QT":
+            if upper == "Q":
+                c = ref + tokens.point()
+            else:
+                c = 2 * pos - last_ctrl if last_cmd.upper() in ("Q", "T") else pos
+            end = ref + tokens.point()
+            current.append(_quadratic(pos, c, end, quantization))
+            pos, last_ctrl = end, c
+        elif upper == "A":
+            rx, ry, phi = tokens.number(), tokens.number(), tokens.number()
+            large_arc, sweep = tokens.flag(), tokens.flag()
+            end = ref + tokens.point()
+            current.append(_arc(pos, rx, ry, phi, large_arc, sweep, end, quantization))
+            pos = end
+        else:
+            # unknown command, give up on the rest of the path
+            break
+        last_cmd = cmd
+
+    end_subpath()
+    return lines
+
+
+def _ellipse(cx: float, cy: float, rx: float, ry: float, quantization: float) -> np.ndarray:
+    # Ramanujan's approximation of the perimeter
+    perimeter = math.pi * (3 * (rx + ry) - math.sqrt((3 * rx + ry) * (rx + 3 * ry)))
+    n = max(_segment_count(perimeter, quantization), 3)
+    angles = np.linspace(0, 2 * math.pi, n + 1)
+    return cx + rx * np.cos(angles) + 1j * (cy + ry * np.sin(angles))
+
+
+def _element_lines(name: str, attrib: Dict[str, str], quantization: float) -> List[np.ndarray]:
+    """Flatten a SVG shape element into lines, in the element's coordinates."""
+    if name == "path":
+        return _parse_path(attrib.get("d", ""), quantization)
+    elif name == "line":
+        return [
+            np.array(
+                [
+                    complex(_length(attrib.get("x1")), _length(attrib.get("y1"))),
+                    complex(_length(attrib.get("x2")), _length(attrib.get("y2"))),
+                ]
+            )
+        ]
+    elif name in ("polyline", "polygon"):
+        v = _numbers(attrib.get("points", ""))
+        line = np.array(v[0 : len(v) // 2 * 2 : 2]) + 1j * np.array(v[1 : len(v) // 2 * 2 : 2])
+        if name == "polygon" and len(line) > 0:
+            line = np.append(line, line[0])
+        return [line] if len(line) > 1 else []
+    elif name == "rect":
+        x, y = _length(attrib.get("x")), _length(attrib.get("y"))
+        w, h = _length(attrib.get("width")), _length(attrib.get("height"))
+        rx, ry = _length(attrib.get("rx"), -1), _length(attrib.get("ry"), -1)
+        rx, ry = min(rx if rx >= 0 else ry, w / 2), min(ry if ry >= 0 else rx, h / 2)
+        if rx > 0 and ry > 0:
+            # rounded corners, drawn as arcs
+            d = (
+                f"M {x + rx},{y} H {x + w - rx} A {rx},{ry} 0 0 1 {x + w},{y + ry} "
+                f"V {y + h - ry} A {rx},{ry} 0 0 1 {x + w - rx},{y + h} "
+                f"H {x + rx} A {rx},{ry} 0 0 1 {x},{y + h - ry} "
+                f"V {y + ry} A {rx},{ry} 0 0 1 {x + rx},{y} Z"
+            )
+            return _parse_path(d, quantization)
+        return [np.array([x, x + w, x + w, x, x]) + 1j * np.array([y, y, y + h, y + h, y])]
+    elif name in ("circle", "ellipse"):
+        cx, cy = _length(attrib.get("cx")), _length(attrib.get("cy"))
+        if name == "circle":
+            rx = ry = _length(attrib.get("r"))
+        else:
+            rx, ry = _length(attrib.get("rx")), _length(attrib.get("ry"))
+        return [_ellipse(cx, cy, rx, ry, quantization)] if rx > 0 and ry > 0 else []
+    return []
+
+
+def _root_size(attrib: Dict[str, str]) -> Tuple[float, float]:
+    """Return the page size of the root element, in pixels, with vpype's defaults."""
+    return (
+        _length(attrib.get("width"), DEFAULT_SIZE[0]),
+        _length(attrib.get("height"), DEFAULT_SIZE[1]),
+    )
+
+
+def _view_box(attrib: Dict[str, str]) -> Optional[List[float]]:
+    view_box = _numbers(attrib.get("viewBox", ""))
+    return view_box if len(view_box) == 4 and view_box[2] > 0 and view_box[3] > 0 else None
+
+
+def _viewport_transform(attrib: Dict[str, str], width: float, height: float) -> np.ndarray:
+    """Compute the transform from the user units of a viewport of some size, e.g. the root
+    element, to its parent's, based on the viewBox."""
+    m = np.identity(3)
+    view_box = _view_box(attrib)
+    if view_box is not None:
+        sx, sy = width / view_box[2], height / view_box[3]
+
+        # preserveAspectRatio, "xMidYMid meet" by default
+        aspect = attrib.get("preserveAspectRatio", "").split()
+        align = aspect[0] if aspect else "xMidYMid"
+        if align != "none":
+            sx = sy = max(sx, sy) if "slice" in aspect else min(sx, sy)
+        align_x = 0 if "xMin" in align else 1 if "xMax" in align else 0.5
+        align_y = 0 if "YMin" in align else 1 if "YMax" in align else 0.5
+
+        m[0] = (sx, 0, (width - view_box[2] * sx) * align_x - view_box[0] * sx)
+        m[1] = (0, sy, (height - view_box[3] * sy) * align_y - view_box[1] * sy)
+    return m
+
+
+def _offset(attrib: Dict[str, str], viewport: Tuple[float, float]) -> np.ndarray:
+    """Return the translation by the x and y attributes of e.g. a <use> element."""
+    x = _length(attrib.get("x"), viewport[0]) if attrib.get("x") else 0.0
+    y = _length(attrib.get("y"), viewport[1]) if attrib.get("y") else 0.0
+    return _translate(x, y)
+
+
+def _nested_viewport(
+    attrib: Dict[str, str], viewport: Tuple[float, float]
+) -> Tuple[np.ndarray, Tuple[float, float]]:
+    """Compute the transform and user space size of a nested <svg> element, within a viewport
+    of the provided size."""
+    width = _length(attrib.get("width"), viewport[0])
+    height = _length(attrib.get("height"), viewport[1])
+    m = _offset(attrib, viewport) @ _viewport_transform(attrib, width, height)
+    view_box = _view_box(attrib)
+    return m, (width, height) if view_box is None else (view_box[2], view_box[3])
+
+
+def _scale(m: np.ndarray) -> float:
+    """Return the largest scale factor of a transform, to adapt the flattening tolerance."""
+    return float(np.linalg.norm(m[:2, :2], 2)) or 1.0
+
+
+def _is_hidden(name: str, attrib: Dict[str, str]) -> bool:
+    return (
+        name in _SKIPPED_TAGS
+        or attrib.get("display") == "none"
+        or "display:none" in attrib.get("style", "").replace(" ", "")
+    )
+
+
+def _use_lines(
+    attrib: Dict[str, str],
+    m: np.ndarray,
+    viewport: Tuple[float, float],
+    quantization: float,
+    refs: Dict[str, ElementTree.Element],
+    depth: int = 0,
+) -> Iterator[np.ndarray]:
+    """Flatten the element referenced by a <use> element, given the latter's transform."""
+    href = attrib.get(_XLINK_HREF) or attrib.get("href") or ""
+    target = refs.get(href[1:]) if href.startswith("#") else None
+    if target is not None and depth < _MAX_USE_DEPTH:
+        m = m @ _offset(attrib, viewport)
+        yield from _subtree_lines(target, m, viewport, quantization, refs, depth + 1, True)
+
+
+def _subtree_lines(
+    elem: ElementTree.Element,
+    m: np.ndarray,
+    viewport: Tuple[float, float],
+    quantization: float,
+    refs: Dict[str, ElementTree.Element],
+    depth: int,
+    used: bool = False,
+) -> Iterator[np.ndarray]:
+    """Flatten an element and its children, e.g. the target of a <use> element (``used``).
+
+    Like with vpype, a <symbol> is drawn as a group, i.e. ignoring its viewBox.
+    """
+    name = _local_name(elem.tag)
+    if _is_hidden(name, elem.attrib) and not (name == "symbol" and used):
+        return
+
+    m = m @ _parse_transform(elem.attrib.get("transform"))
+    if name == "svg":
+        t, viewport = _nested_viewport(elem.attrib, viewport)
+        m = m @ t
+    if name == "use":
+        yield from _use_lines(elem.attrib, m, viewport, quantization, refs, depth)
+    for line in _element_lines(name, elem.attrib, quantization / _scale(m)):
+        yield _apply(m, line)
+    for child in elem:
+        yield from _subtree_lines(child, m, viewport, quantization, refs, depth)
+
+
+def _layer_id(attrib: Dict[str, str], index: int) -> int:
+    """Derive a top-level group's layer ID the way vpype does.
+
+    The digits of the group's label, or else of its ID, are used, 0 being changed to 1. Lacking
+    digits, the group's (0-based) index among top-level groups is used.
+    """
+    digits = re.sub("[^0-9]", "", attrib.get(_INKSCAPE_LABEL) or "")
+    if not digits:
+        digits = re.sub("[^0-9]", "", attrib.get("id") or "")
+    return max(int(digits), 1) if digits else index + 1
+
+
+def iter_svg_batches(
+    path: str,
+    quantization: float,
+    batch_size: int = 10000,
+    max_delay: float = 0.25,
+    crop: bool = True,
+) -> Iterator[Tuple[int, vpype.LineCollection]]:
+    """Incrementally parse a SVG file and yield batches of lines as ``(layer_id, lines)``.
+
+    Layers follow ``vpype.read_multilayer_svg()``: top-level groups are considered as layers,
+    other top-level elements go to layer 1, and lines are cropped to the page unless ``crop``
+    is not set. Curves are flattened with ``quantization`` as tolerance in pixels, whatever the
+    transforms applied to them.
+
+    Since the file is parsed in a single pass, <use> elements are only drawn if they reference
+    an element defined before them in a non-rendered container, such as <defs> or <symbol>.
+
+    Lines are yielded in pixels, as soon as ``batch_size`` lines are available or ``max_delay``
+    seconds after the previous batch, so that a preview may be displayed quickly. Elements are
+    discarded once parsed, so memory use does not depend on the file size.
+    """
+    stack: List[ElementTree.Element] = []
+    transforms: List[np.ndarray] = []
+    viewports: List[Tuple[float, float]] = []
+    layer_ids: List[int] = []
+    refs: Dict[str, ElementTree.Element] = {}
+    group_count = 0
+    hidden_depth = 0
+    page_size = DEFAULT_SIZE
+
+    pending: Dict[int, List[np.ndarray]] = {}
+    pending_count = 0
+    last_flush = time.monotonic()
+
+    def batches() -> Iterator[Tuple[int, vpype.LineCollection]]:
+        for lid, lines in pending.items():
+            lc = vpype.LineCollection(lines)
+            if crop:
+                lc.crop(0, 0, *page_size)
+            if len(lc) > 0:
+                yield lid, lc
+
+    for event, elem in ElementTree.iterparse(path, events=("start", "end")):
+        name = _local_name(elem.tag)
+
+        if event == "start":
+            if not stack:
+                page_size = _root_size(elem.attrib)
+                transform = _viewport_transform(elem.attrib, *page_size)
+                view_box = _view_box(elem.attrib)
+                viewport = page_size if view_box is None else (view_box[2], view_box[3])
+                layer_id = 1
+            else:
+                transform = transforms[-1] @ _parse_transform(elem.attrib.get("transform"))
+                viewport = viewports[-1]
+                if name == "svg":
+                    t, viewport = _nested_viewport(elem.attrib, viewport)
+                    transform = transform @ t
+                layer_id = layer_ids[-1]
+                if len(stack) == 1 and name == "g":
+                    layer_id = _layer_id(elem.attrib, group_count)
+                    group_count += 1
+            if _is_hidden(name, elem.attrib):
+                hidden_depth += 1
+            stack.append(elem)
+            transforms.append(transform)
+            viewports.append(viewport)
+            layer_ids.append(layer_id)
+            continue
+
+        keep = hidden_depth > 0
+        if _is_hidden(name, elem.attrib):
+            hidden_depth -= 1
+            if hidden_depth == 0:
+                # the content of e.g. <defs> is kept for the <use> elements that follow
+                refs.update((e.get("id"), e) for e in elem.iter() if e.get("id"))
+        elif hidden_depth == 0:
+            m = transforms[-1]
+            if name == "use":
+                lines = list(_use_lines(elem.attrib, m, viewports[-1], quantization, refs))
+            else:
+                lines = [
+                    _apply(m, line)
+                    for line in _element_lines(name, elem.attrib, quantization / _scale(m))
+                ]
+            if lines:
+                pending.setdefault(layer_ids[-1], []).extend(lines)
+                pending_count += len(lines)
+
+        # discard the parsed element, unless it may be referenced by a <use> element
+        stack.pop()
+        transforms.pop()
+        viewports.pop()
+        layer_ids.pop()
+        if not keep:
+            elem.clear()
+            if stack:
+                stack[-1].remove(elem)
+
+        now = time.monotonic()
+        if pending_count >= batch_size or (pending_count > 0 and now - last_flush > max_delay):
+            yield from batches()
+            pending = {}
+            pending_count = 0
+            last_flush = now
+
+    yield from batches()
@@ -1,3 +1,7 @@
+import os
+import sys
+from typing import Optional
+
 import vpype
 from PySide2.QtWidgets import QComboBox
 
@@ -8,3 +12,34 @@ class UnitComboBox(QComboBox):
 
         for unit in ["px", "cm", "mm", "in", "pc"]:
             self.addItem(unit, vpype.convert(unit))
+
+
+def memory_usage() -> Optional[int]:
+    """Return the memory currently used by the process in bytes, or None if unavailable."""
+    try:
+        with open("/proc/self/statm") as fp:
+            return int(fp.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    # fallback to peak usage, which is reported in bytes on macOS and kB elsewhere
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def geometry_size(vector_data: vpype.VectorData) -> int:
+    """Return the number of bytes used by the vector data's lines."""
+    return sum(line.nbytes for lc in vector_data.layers.values() for line in lc)
+
+
+def format_size(size: float) -> str:
+    for unit in ["B", "kB", "MB"]:
+        if size < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
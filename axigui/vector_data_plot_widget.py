@@ -1,20 +1,25 @@
 import collections
 import itertools
 from dataclasses import dataclass, field
-from typing import Tuple, Iterable, List, Any
+from typing import Tuple, Iterable, List, Any, Optional, Set, Dict
 
 import matplotlib
 import matplotlib.collections
 import numpy as np
 import vpype
-from PySide2.QtCore import QSettings
-from PySide2.QtWidgets import QVBoxLayout, QWidget, QSizePolicy
+from PySide2.QtCore import QSettings, Qt
+from PySide2.QtGui import QPixmap
+from PySide2.QtWidgets import QVBoxLayout, QWidget, QSizePolicy, QLabel, QStackedWidget
 from matplotlib.backends.backend_qt5agg import (
     FigureCanvasQTAgg as FigureCanvas,
     NavigationToolbar2QT as NavigationToolbar,
 )
 from matplotlib.colors import hsv_to_rgb
 from matplotlib.figure import Figure
+from matplotlib.transforms import Affine2D
+from matplotlib.widgets import LassoSelector
+
+from .spatial_index import PathIndex
 
 COLORS = [
     hsv_to_rgb((h, s, v))
@@ -23,12 +28,55 @@ COLORS = [
     )
 ]
 
+LINE_ALPHA = 0.5
+COLORS_RGBA = np.array([(*c, LINE_ALPHA) for c in COLORS])
+
 matplotlib.use("Qt5Agg")
 
 
+def _as_view(line: np.ndarray) -> np.ndarray:
+    """Return a (N, 2) float view of a complex line, without copy when possible.
+
+    Matplotlib keeps float64 arrays as-is when building paths, so collections built from these
+    views share memory with the vector data instead of holding their own scaled copies.
+    """
+    return np.ascontiguousarray(line, dtype=complex).view(float).reshape(-1, 2)
+
+
+def _affine(a: complex, b: complex) -> Affine2D:
+    """Return the matplotlib transform equivalent to ``z -> a * z + b``."""
+    return Affine2D.from_values(a.real, a.imag, -a.imag, a.real, b.real, b.imag)
+
+
+class _Instance(matplotlib.collections.PathCollection):
+    """Collection rendering the paths of another collection with another transform.
+
+    Edge colors are read from the source collection when drawing, so that all instances share
+    its color array.
+    """
+
+    def __init__(self, source: matplotlib.collections.Collection, transform: Affine2D):
+        super().__init__(
+            source.get_paths(),
+            facecolors="none",
+            linewidths=source.get_linewidth(),
+            transform=transform,
+        )
+        self._source = source
+
+    def get_edgecolor(self):
+        return self._source.get_edgecolor()
+
+
 class VectorDataPlotWidget(QWidget):
     Layer = collections.namedtuple("Layer", "visible color lines")
 
+    # number of recent progress batches kept as separate artists before they are merged
+    PROGRESS_MAX_COLLECTIONS = 32
+
+    # tolerance for selecting paths by tapping, in screen pixels
+    TAP_RADIUS = 10
+
     @dataclass
     class Layer:
         """Keep track of layer information"""
@@ -37,6 +85,14 @@ class VectorDataPlotWidget(QWidget):
         lines: List[Any] = field(default_factory=list)
         visible: bool = True
 
+        # collections holding the per-line colors, shared by their instances
+        collections: List[Any] = field(default_factory=list)
+        points: Any = None
+
+        # per-line colors, computed once per color scheme (keyed by colorful flag)
+        color_offset: int = 0
+        rgba: Dict[bool, np.ndarray] = field(default_factory=dict)
+
     # noinspection PyTypeChecker
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -53,6 +109,8 @@ class VectorDataPlotWidget(QWidget):
         self.canvas.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
         self.canvas.updateGeometry()
         self.toolbar = NavigationToolbar(self.canvas, self)
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+        self.canvas.mpl_connect("button_press_event", self._on_press)
 
         # plot params
         self._vector_data = vpype.VectorData()
@@ -60,6 +118,40 @@ class VectorDataPlotWidget(QWidget):
         self._init_lims = True
         self._layers = {}
 
+        # when set, artists of hidden layers are released instead of hidden
+        self.low_memory = False
+
+        # transform applied to the vector data when rendering, as a (a, b) pair
+        # (z -> a * z + b, in pixels), so that a layout may be displayed without transforming
+        # the geometry
+        self.transform: Tuple[complex, complex] = (1, 0)
+
+        # additional copies of the vector data, as (a, b) transforms relative to the first
+        # copy, rendered as instances sharing the original geometry
+        self.instances: List[Tuple[complex, complex]] = []
+
+        # path selection, paths are identified by (layer_id, line_index)
+        self._index: Optional[PathIndex] = None
+        self._selection: Set[Tuple[int, int]] = set()
+        self._selection_artist = None
+        self._skipped: Dict[int, Set[int]] = {}
+        self._lasso_mode = False
+        self._lasso: Optional[LassoSelector] = None
+
+        # plot progress layer, geometry is kept in page coordinates (pixels) and displayed
+        # until cleared
+        self._progress_active = False
+        self._progress_lines: List[np.ndarray] = []
+        self._progress_collections: List[matplotlib.collections.LineCollection] = []
+
+        # recent batches are merged in a larger collection once there are too many of them,
+        # the first _progress_merged lines being in merged collections
+        self._progress_merged_collections: List[matplotlib.collections.LineCollection] = []
+        self._progress_merged = 0
+
+        # last fully drawn figure, on top of which new artists are blitted
+        self._background = None
+
         # settings
         self._unit: str = self.settings.value("unit", "cm")
         self._colorful: bool = self.settings.value("colorful", False)
@@ -72,7 +164,15 @@ class VectorDataPlotWidget(QWidget):
         layout = QVBoxLayout()
         layout.setMargin(0)
         layout.setSpacing(0)
-        layout.addWidget(self.canvas)
+        # cached preview image, displayed in place of the canvas while it is being rebuilt
+        self._cached_preview = QLabel()
+        self._cached_preview.setAlignment(Qt.AlignCenter)
+        self._cached_preview.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
+        self._stack = QStackedWidget()
+        self._stack.addWidget(self.canvas)
+        self._stack.addWidget(self._cached_preview)
+
+        layout.addWidget(self._stack)
         layout.addWidget(self.toolbar)
         self.setLayout(layout)
 
@@ -82,12 +182,37 @@ class VectorDataPlotWidget(QWidget):
 
     @vector_data.setter
     def vector_data(self, vd):
+        self._set_vector_data(vd)
+        self._replot()
+
+    def set_scene(self, vd: vpype.VectorData, page_format: Tuple[float, float]):
+        """Set both the vector data and the page format, rebuilding the plot only once."""
+        self._page_format = page_format
+        self._set_vector_data(vd)
+        self._replot()
+
+    def _set_vector_data(self, vd: vpype.VectorData):
         self._vector_data = vd
         self._init_lims = True
+        self._index = None
+
+        # line indices are not affected by the layout, so selection is kept when possible
+        self._selection = {
+            (lid, i)
+            for lid, i in self._selection
+            if lid in vd.layers and i < len(vd.layers[lid])
+        }
+        self._skipped = {
+            lid: {i for i in skipped if i < len(vd.layers[lid])}
+            for lid, skipped in self._skipped.items()
+            if lid in vd.layers
+        }
+
         new_layers = {}
         keep_visibility = set(self._layers.keys()) == set(vd.layers.keys())
         color_idx = 0
-        for lid in self._vector_data.layers:
+        color_offset = 0
+        for lid, lc in self._vector_data.layers.items():
             color = COLORS[color_idx]
             color_idx += 1
             if color_idx >= len(COLORS):
@@ -96,10 +221,12 @@ class VectorDataPlotWidget(QWidget):
                 visible = self._layers[lid].visible
             else:
                 visible = True
-            new_layers[lid] = self.Layer(visible=visible, color=color, lines=[])
+            new_layers[lid] = self.Layer(
+                visible=visible, color=color, lines=[], color_offset=color_offset
+            )
+            color_offset = (color_offset + len(lc)) % len(COLORS)
 
         self._layers = new_layers
-        self._replot()
 
     @property
     def page_format(self) -> Tuple[float, float]:
@@ -130,7 +257,13 @@ class VectorDataPlotWidget(QWidget):
     def colorful(self, value: bool):
         self._colorful = value
         self.settings.setValue("colorful", value)
-        self._replot()
+
+        # only colors are updated, the geometry is left untouched
+        for layer_id, layer_spec in self._layers.items():
+            self._update_layer_colors(layer_id)
+            if layer_spec.points is not None:
+                layer_spec.points.set_facecolor("k" if value else [layer_spec.color])
+        self.canvas.draw_idle()
 
     @property
     def show_points(self) -> bool:
@@ -164,6 +297,252 @@ class VectorDataPlotWidget(QWidget):
         self.settings.setValue("show_grid", value)
         self._replot()
 
+    @property
+    def lasso_mode(self) -> bool:
+        return self._lasso_mode
+
+    @lasso_mode.setter
+    def lasso_mode(self, value: bool):
+        self._lasso_mode = value
+        self._setup_lasso()
+
+    @property
+    def index(self) -> PathIndex:
+        """Spatial index of the displayed paths, built on first use."""
+        if self._index is None:
+            self._index = PathIndex(self._vector_data)
+        return self._index
+
+    @property
+    def selection(self) -> Set[Tuple[int, int]]:
+        return set(self._selection)
+
+    def clear_selection(self):
+        self._selection = set()
+        self._update_selection_artist()
+
+    def skip_selection(self):
+        """Hide the selected paths and exclude them from plotting."""
+        layer_ids = set()
+        for lid, i in self._selection:
+            self._skipped.setdefault(lid, set()).add(i)
+            layer_ids.add(lid)
+        for lid in layer_ids:
+            self._update_layer_colors(lid)
+        self.clear_selection()
+
+    def restore_skipped(self):
+        """Show and include all previously skipped paths."""
+        layer_ids = list(self._skipped.keys())
+        self._skipped = {}
+        for lid in layer_ids:
+            self._update_layer_colors(lid)
+        self.canvas.draw_idle()
+
+    def skipped_lines(self, layer_id: int) -> Set[int]:
+        return self._skipped.get(layer_id, set())
+
+    def has_skipped(self) -> bool:
+        return any(self._skipped.values())
+
+    def _selectable(self, key: Tuple[int, int]) -> bool:
+        lid, i = key
+        return self.layer_visible(lid) and i not in self.skipped_lines(lid)
+
+    def _on_press(self, event):
+        if (
+            event.inaxes is not self.ax
+            or event.button != 1
+            or self.toolbar.mode
+            or self._lasso_mode
+        ):
+            return
+
+        # convert the tap radius from screen to page coordinates
+        scale = 1 / vpype.convert(self._unit)
+        inv = self.ax.transData.inverted()
+        (x0, _), (x1, _) = inv.transform(
+            [(event.x, event.y), (event.x + self.TAP_RADIUS, event.y)]
+        )
+        p = complex(event.xdata, event.ydata) / scale
+        radius = abs(x1 - x0) / scale / abs(self.transform[0])
+        key = None
+        for a, b in [(1, 0)] + self.instances:
+            # copies are only rotated and translated, so the radius is unaffected
+            q = self._to_data((p - b) / a)
+            key = self.index.nearest(q.real, q.imag, radius, accept=self._selectable)
+            if key is not None:
+                break
+
+        if key is None:
+            self._selection = set()
+        elif key in self._selection:
+            self._selection.remove(key)
+        else:
+            self._selection.add(key)
+        self._update_selection_artist()
+
+    def _on_lasso(self, vertices):
+        scale = 1 / vpype.convert(self._unit)
+        polygon = np.asarray(vertices) / scale
+        polygon = polygon[:, 0] + 1j * polygon[:, 1]
+        for a, b in [(1, 0)] + self.instances:
+            q = self._to_data((polygon - b) / a)
+            self._selection.update(
+                self.index.inside(np.vstack([q.real, q.imag]).T, accept=self._selectable)
+            )
+        self._update_selection_artist()
+
+    def _to_data(self, p):
+        """Convert page coordinates (in pixels) to vector data coordinates."""
+        a, b = self.transform
+        return (p - b) / a
+
+    def _data_transform(self, instance: Tuple[complex, complex] = (1, 0)):
+        """Return the matplotlib transform from vector data (in pixels) to display, for the
+        first copy or for one of the instances."""
+        scale = 1 / vpype.convert(self._unit)
+        return (
+            _affine(*self.transform)
+            + _affine(*instance)
+            + Affine2D().scale(scale)
+            + self.ax.transData
+        )
+
+    def _setup_lasso(self):
+        if self._lasso is not None:
+            self._lasso.disconnect_events()
+            self._lasso = None
+        if self._lasso_mode:
+            self._lasso = LassoSelector(self.ax, onselect=self._on_lasso)
+
+    def _add_instances(self, collection, autolim: bool = True) -> List[Any]:
+        """Render the instances of a collection, sharing its paths and colors."""
+        instances = []
+        for a, b in self.instances:
+            inst = _Instance(collection, self._data_transform((a, b)))
+            self.ax.add_collection(inst, autolim=autolim)
+            instances.append(inst)
+        return instances
+
+    def _update_selection_artist(self, draw: bool = True):
+        for artist in self._selection_artist or []:
+            artist.remove()
+        self._selection_artist = None
+
+        if self._selection:
+            coll = matplotlib.collections.LineCollection(
+                [_as_view(self._vector_data.layers[lid][i]) for lid, i in self._selection],
+                transform=self._data_transform(),
+                color=(1, 0, 0),
+                lw=2,
+            )
+            self.ax.add_collection(coll, autolim=False)
+            self._selection_artist = [coll] + self._add_instances(coll, autolim=False)
+
+        if draw:
+            self.canvas.draw_idle()
+
+    def _layer_rgba(self, layer_id: int) -> np.ndarray:
+        """Return the per-line colors of a layer for the current color scheme.
+
+        Colors are computed once and reused until the vector data changes. In the default
+        scheme, the array is a read-only broadcast of the layer color. Matplotlib still copies
+        it into the layer's collection, whose instances share that copy.
+        """
+        layer_spec = self._layers[layer_id]
+        rgba = layer_spec.rgba.get(self._colorful)
+        if rgba is None:
+            n = len(self._vector_data.layers[layer_id])
+            if self._colorful:
+                rgba = COLORS_RGBA[(layer_spec.color_offset + np.arange(n)) % len(COLORS)]
+            else:
+                rgba = np.broadcast_to(np.array((*layer_spec.color, LINE_ALPHA)), (n, 4))
+            layer_spec.rgba[self._colorful] = rgba
+        return rgba
+
+    def _update_layer_colors(self, layer_id: int):
+        """Apply the per-line colors of a layer, with skipped lines fully transparent."""
+        layer_spec = self._layers.get(layer_id)
+        if layer_spec is None or not layer_spec.collections:
+            return
+
+        rgba = self._layer_rgba(layer_id)
+        skipped = self.skipped_lines(layer_id)
+        if skipped:
+            rgba = rgba.copy()
+            rgba[list(skipped), 3] = 0
+        for coll in layer_spec.collections:
+            coll.set_edgecolor(rgba)
+
+    def append_lines(self, layer_id: int, lines: Iterable[np.ndarray]):
+        """Add lines (in pixels) to the preview without replotting, e.g. while loading.
+
+        The lines are drawn on top of the cached background, like plot progress. They are not
+        added to the vector data, which must be set once loading is done.
+        """
+        if layer_id not in self._layers:
+            color = COLORS[len(self._layers) % len(COLORS)]
+            self._layers[layer_id] = self.Layer(color=color)
+
+        layer_spec = self._layers[layer_id]
+        coll = matplotlib.collections.LineCollection(
+            [_as_view(line) for line in lines],
+            transform=self._data_transform(),
+            color=(*layer_spec.color, LINE_ALPHA),
+            lw=1,
+        )
+        coll.set_visible(layer_spec.visible)
+        self.ax.add_collection(coll, autolim=False)
+        layer_spec.lines.append(coll)
+        if layer_spec.visible:
+            self._blit(coll)
+
+    def display_options(self) -> dict:
+        """Return the options affecting the rendering, e.g. to identify a cached preview."""
+        return {
+            "unit": self._unit,
+            "colorful": self._colorful,
+            "show_points": self._show_points,
+            "show_pen_up": self._show_pen_up,
+            "show_axes": self._show_axes,
+            "hidden_layers": sorted(
+                lid for lid, spec in self._layers.items() if not spec.visible
+            ),
+            "skipped": sorted(
+                [lid, sorted(lines)] for lid, lines in self._skipped.items() if lines
+            ),
+        }
+
+    def grab_preview(self) -> QPixmap:
+        """Render the plot to a pixmap, without the selection highlight.
+
+        The last rendering is grabbed, a pending one being done first, and the figure is only
+        redrawn if the selection is highlighted.
+        """
+        artists = [artist for artist in self._selection_artist or [] if artist.get_visible()]
+        for artist in artists:
+            artist.set_visible(False)
+        if artists:
+            self.canvas.draw_idle()
+        # painting the canvas renders it if a draw is pending
+        pixmap = self.canvas.grab()
+        for artist in artists:
+            artist.set_visible(True)
+        if artists:
+            self.canvas.draw_idle()
+        return pixmap
+
+    def show_cached_preview(self, pixmap: QPixmap):
+        self._cached_preview.setPixmap(
+            pixmap.scaled(self.canvas.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        )
+        self._stack.setCurrentWidget(self._cached_preview)
+
+    def hide_cached_preview(self):
+        self._stack.setCurrentWidget(self.canvas)
+        self._cached_preview.clear()
+
     def layer_visible(self, layer_id: int) -> bool:
         try:
             return self._layers[layer_id].visible
@@ -174,6 +553,15 @@ class VectorDataPlotWidget(QWidget):
         if layer_id in self._layers:
             layer_spec = self._layers[layer_id]
             layer_spec.visible = visible
+            if self.low_memory:
+                if visible and not layer_spec.lines:
+                    self._replot()
+                    return
+                if not visible:
+                    for ln in layer_spec.lines:
+                        ln.remove()
+                    layer_spec.lines = []
+                    layer_spec.collections = []
             for ln in layer_spec.lines:
                 ln.set_visible(layer_spec.visible)
             self.canvas.draw()
@@ -184,6 +572,95 @@ class VectorDataPlotWidget(QWidget):
         except KeyError:
             return 0, 0, 0
 
+    def begin_progress(self):
+        """Start displaying plot progress on top of the current plot.
+
+        The progress of a previous plot is cleared.
+        """
+        self.clear_progress()
+        self._progress_active = True
+
+    def end_progress(self):
+        """Stop displaying plot progress, the plotted lines being kept until cleared."""
+        self._progress_active = False
+
+    def clear_progress(self):
+        """Remove the plot progress layer."""
+        self._progress_active = False
+        if self._progress_lines:
+            self._remove_progress_artists()
+            self._progress_lines = []
+            self.canvas.draw_idle()
+
+    def add_progress_lines(self, lines: Iterable[np.ndarray]):
+        """Mark some lines (in pixel coordinates) as plotted.
+
+        Only the new lines are rendered, on top of the cached background, so the cost of an
+        update doesn't depend on the size of the drawing.
+        """
+        if not self._progress_active:
+            return
+
+        lines = list(lines)
+        if not lines:
+            return
+
+        if len(self._progress_collections) >= self.PROGRESS_MAX_COLLECTIONS:
+            # merge recent batches to bound the number of artists, they are already part of the
+            # cached background so nothing needs to be redrawn
+            for coll in self._progress_collections:
+                coll.remove()
+            self._progress_collections = []
+            recent = self._progress_lines[self._progress_merged :]
+            self._progress_merged_collections.append(self._add_progress_collection(recent))
+            self._progress_merged = len(self._progress_lines)
+
+        self._progress_lines.extend(lines)
+        coll = self._add_progress_collection(lines)
+        self._progress_collections.append(coll)
+        self._blit(coll)
+
+    def _blit(self, artist):
+        """Draw an artist on top of the cached background, without redrawing the figure."""
+        if self._background is None:
+            self.canvas.draw_idle()
+            return
+
+        self.canvas.restore_region(self._background)
+        self.ax.draw_artist(artist)
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.canvas.blit(self.fig.bbox)
+
+    def _on_draw(self, _):
+        self._background = self.canvas.copy_from_bbox(self.fig.bbox)
+
+    def _add_progress_collection(self, lines: List[np.ndarray]):
+        scale = 1 / vpype.convert(self._unit)
+        coll = matplotlib.collections.LineCollection(
+            [_as_view(line) for line in lines],
+            transform=Affine2D().scale(scale) + self.ax.transData,
+            color=(0, 0, 0),
+            lw=1.5,
+        )
+        self.ax.add_collection(coll, autolim=False)
+        return coll
+
+    def _add_progress_artists(self):
+        self._progress_collections = []
+        self._progress_merged_collections = []
+        if self._progress_lines:
+            self._progress_merged_collections.append(
+                self._add_progress_collection(self._progress_lines)
+            )
+        self._progress_merged = len(self._progress_lines)
+
+    def _remove_progress_artists(self):
+        for coll in self._progress_collections + self._progress_merged_collections:
+            coll.remove()
+        self._progress_collections = []
+        self._progress_merged_collections = []
+        self._progress_merged = 0
+
     def _replot(self):
         if not self._init_lims:
             old_lims = (self.ax.get_xlim(), self.ax.get_ylim())
@@ -191,6 +668,8 @@ class VectorDataPlotWidget(QWidget):
             old_lims = None
             self._init_lims = False
         self.ax.cla()
+        self._background = None
+        self._selection_artist = None
 
         scale = 1 / vpype.convert(self._unit)
 
@@ -208,49 +687,50 @@ class VectorDataPlotWidget(QWidget):
             alpha=0.3,
         )
 
-        color_idx = 0
+        # geometry is kept in pixels and laid out and scaled by the artist transform
+        data_transform = self._data_transform()
+        a, b = self.transform
+
         for layer_id, lc in self._vector_data.layers.items():
-            if self._colorful:
-                color = COLORS[color_idx:] + COLORS[:color_idx]
-                marker_color = "k"
-                color_idx += len(lc)
-                if color_idx >= len(COLORS):
-                    color_idx = color_idx % len(COLORS)
-            else:
-                color = self._layers[layer_id].color
-                marker_color = [color]
+            layer_spec = self._layers[layer_id]
+            layer_spec.points = None
+            if self.low_memory and not layer_spec.visible:
+                layer_spec.lines = []
+                layer_spec.collections = []
+                continue
 
             layer_lines = matplotlib.collections.LineCollection(
-                (vpype.as_vector(line) * scale for line in lc),
-                color=color,
+                [_as_view(line) for line in lc],
+                transform=data_transform,
                 lw=1,
-                alpha=0.5,
                 label=str(layer_id),
             )
-            self._layers[layer_id].lines = [layer_lines]
             self.ax.add_collection(layer_lines)
+            instances = self._add_instances(layer_lines)
+            layer_spec.collections = [layer_lines]
+            layer_spec.lines = [layer_lines] + instances
+            self._update_layer_colors(layer_id)
 
             if self._show_points:
-                points = np.hstack([line for line in lc]) * scale
+                marker_color = "k" if self._colorful else [layer_spec.color]
+                points = (a * np.hstack([line for line in lc]) + b) * scale
                 layer_points = self.ax.scatter(
                     points.real, points.imag, marker=".", c=marker_color, s=16
                 )
-                self._layers[layer_id].lines.append(layer_points)
+                layer_spec.points = layer_points
+                layer_spec.lines.append(layer_points)
 
             if self._show_pen_up:
                 pen_up_lines = matplotlib.collections.LineCollection(
                     (
-                        (
-                            vpype.as_vector(lc[i])[-1] * scale,
-                            vpype.as_vector(lc[i + 1])[0] * scale,
-                        )
+                        _as_view(a * np.array([lc[i][-1], lc[i + 1][0]]) + b) * scale
                         for i in range(len(lc) - 1)
                     ),
                     color=(0, 0, 0),
                     lw=0.5,
                     alpha=0.5,
                 )
-                self._layers[layer_id].lines.append(pen_up_lines)
+                layer_spec.lines.append(pen_up_lines)
                 self.ax.add_collection(pen_up_lines)
 
         self.ax.invert_yaxis()
@@ -284,4 +764,10 @@ class VectorDataPlotWidget(QWidget):
         for text in self.ax.get_yticklabels():
             text.set_horizontalalignment("left")
             text.set_verticalalignment("center")
-        self.canvas.draw()
+
+        self._update_selection_artist(draw=False)
+        self._setup_lasso()
+        self._add_progress_artists()
+
+        # successive changes, e.g. of the layout and the geometry, are rendered only once
+        self.canvas.draw_idle()
@@ -0,0 +1,92 @@
+"""Compare inline and parallel per-layer layout processing.
+
+The same packed code is run one layer after the other in the current process, then in the
+process pool. A plain Python loop over the lines and single numpy expressions over all the
+packed vertices are also timed for reference, as well as the creation of per-line views,
+which is serial in all cases.
+
+Run with ``python -m benchmarks.pipeline [layer_count] [lines_per_layer]``.
+"""
+
+import sys
+import time
+
+import numpy as np
+import vpype
+
+from axigui.pipeline import PackedVectorData, shared_memory
+
+
+def _make_vector_data(layer_count: int, line_count: int) -> vpype.VectorData:
+    rng = np.random.default_rng(0)
+    vd = vpype.VectorData()
+    for lid in range(1, layer_count + 1):
+        lines = rng.uniform(0, 1000, (line_count, 50)) + 1j * rng.uniform(
+            0, 1000, (line_count, 50)
+        )
+        vd.add(vpype.LineCollection(list(lines)), lid)
+    return vd
+
+
+def _loop(vd: vpype.VectorData, a: complex, b: complex):
+    bounds = vd.bounds()
+    out = vpype.VectorData()
+    for lid, lc in vd.layers.items():
+        out.add(vpype.LineCollection([line * a + b for line in lc]), lid)
+    return bounds, out
+
+
+def _whole_array(vertices: np.ndarray, a: complex, b: complex):
+    bounds = (
+        vertices.real.min(),
+        vertices.imag.min(),
+        vertices.real.max(),
+        vertices.imag.max(),
+    )
+    return bounds, vertices * a + b
+
+
+def _packed(packed: PackedVectorData, a: complex, b: complex):
+    return packed.bounds(), packed.transform(a, b)
+
+
+def _time(func, *args, repeat: int = 5) -> float:
+    func(*args)  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(*args)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    if shared_memory is None:
+        print("shared memory is not available, parallel processing is disabled")
+        return
+
+    layer_count = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    line_count = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    vd = _make_vector_data(layer_count, line_count)
+    a, b = 0.5j, 100 + 200j
+
+    loop = _time(_loop, vd, a, b)
+    packed = PackedVectorData(vd)
+    try:
+        packed.parallel = False
+        inline = _time(_packed, packed, a, b)
+        packed.parallel = True
+        parallel = _time(_packed, packed, a, b)
+        whole_array = _time(_whole_array, np.asarray(packed._block), a, b)
+        views = _time(packed.vector_data)
+    finally:
+        packed.close()
+
+    print(f"{layer_count} layers x {line_count} lines x 50 vertices")
+    print(f"python loop: {loop * 1000:.1f} ms")
+    print(f"whole array: {whole_array * 1000:.1f} ms")
+    print(f"inline:      {inline * 1000:.1f} ms")
+    print(f"parallel:    {parallel * 1000:.1f} ms ({inline / parallel:.2f}x)")
+    print(f"views only:  {views * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
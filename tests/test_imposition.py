@@ -0,0 +1,102 @@
+import io
+import os
+import xml.etree.ElementTree as ElementTree
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from axigui.main import _chunk_lines, _imposition_transforms, _iter_plot_lines
+from axigui.main import _write_plot_svg, _write_svg_lines
+
+SVG_NS = "{http://www.w3.org/2000/svg}"
+
+
+def _corners(bounds, t):
+    a, b = t
+    corners = [a * complex(x, y) + b for x in bounds[0::2] for y in bounds[1::2]]
+    return (
+        min(c.real for c in corners),
+        min(c.imag for c in corners),
+        max(c.real for c in corners),
+        max(c.imag for c in corners),
+    )
+
+
+def test_imposition_grid():
+    transforms = _imposition_transforms((0, 0, 10, 20), 2, 3, 5, 0)
+    assert all(a == 1 for a, _ in transforms)
+
+    # rows run alternately forward and backward
+    assert [b for _, b in transforms] == [0, 15, 30, 30 + 25j, 15 + 25j, 25j]
+
+
+def test_imposition_rotation():
+    bounds = (10, 10, 20, 30)
+    transforms = _imposition_transforms(bounds, 1, 2, 5, 90)
+    np.testing.assert_allclose(
+        [_corners(bounds, t) for t in transforms], [(10, 10, 30, 20), (35, 10, 55, 20)]
+    )
+
+
+@pytest.fixture
+def lines():
+    return [np.array([0, 1 + 1j]), np.array([2, 3, 3 + 1j]), np.array([4j, 5j])]
+
+
+def test_iter_plot_lines(lines):
+    result = list(_iter_plot_lines(lines, {1}, [(1, 0), (1, 10), (1j, 0)], {1}))
+    expected = [
+        lines[0],
+        lines[2],
+        lines[2][::-1] + 10,
+        lines[0][::-1] + 10,
+        lines[0] * 1j,
+        lines[2] * 1j,
+    ]
+    assert len(result) == len(expected)
+    for line, expected_line in zip(result, expected):
+        np.testing.assert_allclose(line, expected_line)
+
+
+def test_iter_plot_lines_shares_identity(lines):
+    # the first copy is plotted from the original geometry
+    result = list(_iter_plot_lines(lines, set(), [(1, 0)], set()))
+    assert all(line is original for line, original in zip(result, lines))
+
+
+def test_chunk_lines():
+    lines = [np.zeros(n) for n in (3, 4, 10, 2, 1)]
+    chunks = list(_chunk_lines(iter(lines), 5))
+    assert [[len(line) for line in chunk] for chunk in chunks] == [[3, 4], [10], [2, 1]]
+    assert list(_chunk_lines([], 5)) == []
+
+
+def _read_points(svg: str):
+    root = ElementTree.fromstring(svg)
+    assert root.get("viewBox") == "0 0 960 480"
+    assert root.get("width") == "25.40000000cm"
+    return [
+        [complex(*map(float, p.split(","))) for p in polyline.get("points").split()]
+        for polyline in root.iter(SVG_NS + "polyline")
+    ]
+
+
+def test_write_svg_lines(lines):
+    fp = io.StringIO()
+    _write_svg_lines(fp, iter(lines), (960, 480))
+    for points, line in zip(_read_points(fp.getvalue()), lines):
+        np.testing.assert_allclose(points, line)
+
+
+@pytest.mark.parametrize("to_file", [False, True])
+def test_write_plot_svg(lines, to_file):
+    result = _write_plot_svg(iter(lines), (960, 480), to_file)
+    if to_file:
+        with open(result) as fp:
+            svg = fp.read()
+        os.remove(result)
+    else:
+        svg = result
+    assert len(_read_points(svg)) == len(lines)
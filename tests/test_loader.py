@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+import vpype
+
+from axigui import pipeline
+from axigui.loader import SvgLoader
+
+SVG = """<?xml version="1.0"?>
+<svg xmlns="http://www.w3.org/2000/svg" width="200mm" height="100mm" viewBox="0 0 400 200">
+  <g id="layer1"><path d="M 10 10 L 50 10 L 50 40"/><circle cx="100" cy="100" r="30"/></g>
+  <g id="layer2"><rect x="10" y="10" width="30" height="20"/></g>
+</svg>
+"""
+
+
+@pytest.fixture
+def svg_path(tmp_path):
+    path = tmp_path / "drawing.svg"
+    path.write_text(SVG)
+    return str(path)
+
+
+@pytest.mark.skipif(pipeline.shared_memory is None, reason="requires shared memory")
+def test_pack(svg_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "MIN_PARALLEL_SIZE", 0)
+    loader = SvgLoader(svg_path, 0.5, pack=True)
+    loader.run()
+    expected = vpype.read_multilayer_svg(svg_path, 0.5)
+    try:
+        assert loader.packed is not None
+        assert list(loader.vector_data.layers) == list(expected.layers)
+        for lc, expected_lc in zip(
+            loader.vector_data.layers.values(), expected.layers.values()
+        ):
+            for line, expected_line in zip(lc, expected_lc):
+                np.testing.assert_allclose(line, expected_line)
+
+        # computed in the loader thread
+        assert loader.packed._cached_bounds == pytest.approx(expected.bounds())
+    finally:
+        loader.packed.close()
+
+
+def test_failed(tmp_path):
+    loader = SvgLoader(str(tmp_path / "missing.svg"), 0.5, pack=True)
+    messages = []
+    loader.failed.connect(lambda _, message: messages.append(message))
+    loader.run()
+    assert loader.vector_data is None
+    assert len(messages) == 1
@@ -0,0 +1,75 @@
+import gc
+
+import numpy as np
+import pytest
+import vpype
+
+from axigui.pipeline import PackedVectorData, shared_memory
+
+pytestmark = pytest.mark.skipif(shared_memory is None, reason="requires shared memory")
+
+
+@pytest.fixture
+def vector_data():
+    rng = np.random.default_rng(0)
+    vd = vpype.VectorData()
+    for lid in (1, 2, 5):
+        lines = [
+            rng.uniform(0, 100, n) + 1j * rng.uniform(0, 100, n)
+            for n in rng.integers(2, 20, 200)
+        ]
+        vd.add(vpype.LineCollection(lines), lid)
+    return vd
+
+
+def _assert_equal(vd1: vpype.VectorData, vd2: vpype.VectorData):
+    assert list(vd1.layers) == list(vd2.layers)
+    for lc1, lc2 in zip(vd1.layers.values(), vd2.layers.values()):
+        assert len(lc1) == len(lc2)
+        for line1, line2 in zip(lc1, lc2):
+            np.testing.assert_allclose(line1, line2)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_packed_matches_serial(vector_data, parallel):
+    a, b = 0.5j, 100 + 200j
+    expected = vpype.VectorData()
+    for lid, lc in vector_data.layers.items():
+        expected.add(vpype.LineCollection([line * a + b for line in lc]), lid)
+
+    packed = PackedVectorData(vector_data, parallel=parallel)
+    try:
+        _assert_equal(packed.vector_data(), vector_data)
+        _assert_equal(packed.transform(a, b), expected)
+        assert packed.bounds() == pytest.approx(vector_data.bounds())
+    finally:
+        packed.close()
+
+
+def test_views_outlive_packed(vector_data):
+    packed = PackedVectorData(vector_data, parallel=False)
+    base = packed.vector_data()
+    transformed = packed.transform(2, 0)
+    packed.close()
+    del packed
+    gc.collect()
+
+    _assert_equal(base, vector_data)
+    for line, original in zip(transformed.layers[5], vector_data.layers[5]):
+        np.testing.assert_allclose(line, 2 * original)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_blocks_unlinked_early(vector_data, parallel):
+    # blocks are only reachable by name while processed, so that none leaks if the views
+    # outlive the application
+    packed = PackedVectorData(vector_data, parallel=parallel)
+    name = packed._block.shm.name
+    packed.transform(2, 0)
+    packed.close()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+def test_create_skips_small_data(vector_data):
+    assert PackedVectorData.create(vector_data) is None
@@ -0,0 +1,137 @@
+import threading
+
+import pytest
+
+from axigui.plot_worker import PlotWorker
+
+
+class Recorder:
+    """Stub prepare and plot callables recording their calls, with two chunks per layer."""
+
+    def __init__(self, fail_prepare=None, fail_plot=None):
+        self.events = []
+        self.prepared = {}
+        self._fail_prepare = fail_prepare
+        self._fail_plot = fail_plot
+
+    def prepare(self, lid):
+        for k in range(2):
+            self.events.append(("prepare", lid, k))
+            if (lid, k) == self._fail_prepare:
+                raise ValueError(f"cannot prepare {lid}")
+            self.prepared.setdefault((lid, k), threading.Event()).set()
+            yield lid, k
+
+    def plot(self, chunk):
+        if chunk == self._fail_plot:
+            raise RuntimeError
+        self.events.append(("plot", *chunk))
+
+
+def _worker(recorder, layer_ids, prefetch=True, on_pen_change="resume"):
+    worker = PlotWorker(layer_ids, recorder.prepare, recorder.plot, prefetch=prefetch)
+    worker.pen_change_requested.connect(
+        lambda lid: recorder.events.append(("pen", lid)) or getattr(worker, on_pen_change)()
+    )
+    worker.chunk_finished.connect(
+        lambda lid, chunk: recorder.events.append(("chunk", lid, chunk))
+    )
+    worker.layer_finished.connect(lambda lid: recorder.events.append(("finished", lid)))
+    return worker
+
+
+def test_prefetch():
+    recorder = Recorder()
+    plot = recorder.plot
+
+    def slow_plot(chunk):
+        # the next chunk, possibly of the next layer, is prepared while this one is plotted
+        next_chunk = (chunk[0], 1) if chunk[1] == 0 else (chunk[0] + 1, 0)
+        if next_chunk[0] <= 2:
+            assert recorder.prepared.setdefault(next_chunk, threading.Event()).wait(5)
+        plot(chunk)
+
+    recorder.plot = slow_plot
+    _worker(recorder, [1, 2])._run()
+    assert recorder.events == [
+        ("prepare", 1, 0),
+        ("prepare", 1, 1),
+        ("plot", 1, 0),
+        ("chunk", 1, (1, 0)),
+        ("prepare", 2, 0),
+        ("plot", 1, 1),
+        ("chunk", 1, (1, 1)),
+        ("finished", 1),
+        ("pen", 2),
+        ("prepare", 2, 1),
+        ("plot", 2, 0),
+        ("chunk", 2, (2, 0)),
+        ("plot", 2, 1),
+        ("chunk", 2, (2, 1)),
+        ("finished", 2),
+    ]
+
+
+def test_no_prefetch():
+    recorder = Recorder()
+    _worker(recorder, [3, 1], prefetch=False)._run()
+    assert recorder.events == [
+        ("prepare", 3, 0),
+        ("plot", 3, 0),
+        ("chunk", 3, (3, 0)),
+        ("prepare", 3, 1),
+        ("plot", 3, 1),
+        ("chunk", 3, (3, 1)),
+        ("prepare", 1, 0),
+        ("finished", 3),
+        ("pen", 1),
+        ("plot", 1, 0),
+        ("chunk", 1, (1, 0)),
+        ("prepare", 1, 1),
+        ("plot", 1, 1),
+        ("chunk", 1, (1, 1)),
+        ("finished", 1),
+    ]
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_cancel_on_pen_change(prefetch):
+    recorder = Recorder()
+    _worker(recorder, [1, 2], prefetch=prefetch, on_pen_change="cancel")._run()
+    assert [e for e in recorder.events if e[0] not in ("prepare", "plot")] == [
+        ("chunk", 1, (1, 0)),
+        ("chunk", 1, (1, 1)),
+        ("finished", 1),
+        ("pen", 2),
+    ]
+
+
+def test_cancel_between_chunks():
+    recorder = Recorder()
+    worker = _worker(recorder, [1, 2])
+    worker.chunk_finished.connect(lambda lid, chunk: worker.cancel())
+    worker._run()
+    assert [e for e in recorder.events if e[0] == "plot"] == [("plot", 1, 0)]
+    assert ("finished", 1) not in recorder.events
+
+
+def test_empty():
+    recorder = Recorder()
+    _worker(recorder, [])._run()
+    assert recorder.events == []
+
+
+@pytest.mark.parametrize(
+    "recorder, message",
+    [
+        (Recorder(fail_prepare=(2, 0)), "cannot prepare 2"),
+        (Recorder(fail_plot=(1, 1)), "RuntimeError"),
+    ],
+)
+def test_failed(recorder, message):
+    worker = _worker(recorder, [1, 2])
+    messages = []
+    worker.failed.connect(messages.append)
+    worker.run()
+    assert messages == [message]
+    assert not [e for e in recorder.events if e[:2] == ("plot", 2)]
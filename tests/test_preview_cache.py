@@ -0,0 +1,78 @@
+import os
+
+import pytest
+from PySide2.QtCore import Qt
+from PySide2.QtGui import QGuiApplication, QPixmap
+
+from axigui.preview_cache import PreviewCache
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+@pytest.fixture(scope="module", autouse=True)
+def app():
+    yield QGuiApplication.instance() or QGuiApplication([])
+
+
+@pytest.fixture
+def svg_path(tmp_path):
+    path = tmp_path / "drawing.svg"
+    path.write_text("<svg/>")
+    return str(path)
+
+
+def _pixmap(color=Qt.red, size=(200, 100)) -> QPixmap:
+    pixmap = QPixmap(*size)
+    pixmap.fill(color)
+    return pixmap
+
+
+def test_key(svg_path):
+    key = PreviewCache.key(svg_path, {"a": 1})
+    assert key == PreviewCache.key(svg_path, {"a": 1})
+    assert key != PreviewCache.key(svg_path, {"a": 2})
+    assert key != PreviewCache.key(svg_path)
+    assert PreviewCache.key(svg_path + ".missing") is None
+
+    os.utime(svg_path, ns=(0, 0))
+    assert key != PreviewCache.key(svg_path, {"a": 1})
+
+
+def test_put_get(tmp_path, svg_path):
+    cache = PreviewCache(str(tmp_path / "cache"))
+    key = PreviewCache.key(svg_path, {"a": 1})
+    assert cache.get(key) is None
+    assert cache.get(None) is None
+
+    cache.put(key, _pixmap())
+    assert cache.get(key).size() == _pixmap().size()
+
+    # entries are reloaded from disk by another cache
+    other = PreviewCache(str(tmp_path / "cache"))
+    pixmap = other.get(key)
+    assert pixmap is not None
+    assert pixmap.toImage().pixelColor(0, 0) == _pixmap().toImage().pixelColor(0, 0)
+
+
+def test_put_preview_stores_thumbnail(tmp_path, svg_path):
+    cache = PreviewCache(str(tmp_path / "cache"))
+    cache.put_preview(svg_path, {"a": 1}, _pixmap(size=(400, 200)))
+
+    thumbnail = cache.thumbnail(svg_path)
+    assert thumbnail.width() == PreviewCache.THUMBNAIL_SIZE
+    assert thumbnail.height() == PreviewCache.THUMBNAIL_SIZE // 2
+
+
+def test_eviction(tmp_path, svg_path):
+    directory = str(tmp_path / "cache")
+    cache = PreviewCache(directory, max_memory_entries=2, max_disk_entries=3)
+    keys = [PreviewCache.key(svg_path, {"i": i}) for i in range(5)]
+    for i, key in enumerate(keys):
+        cache.put(key, _pixmap())
+        # make sure modification times are ordered
+        os.utime(os.path.join(directory, key + ".png"), ns=(i * 10 ** 9, i * 10 ** 9))
+
+    assert len(cache._memory) == 2
+    assert sorted(os.listdir(directory)) == sorted(key + ".png" for key in keys[2:])
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) is not None
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+import vpype
+from matplotlib.path import Path
+
+from axigui.spatial_index import PathIndex
+
+
+def _segment_distance(line: np.ndarray, p: complex) -> float:
+    if len(line) == 1:
+        return abs(line[0] - p)
+    dist = []
+    for a, b in zip(line[:-1], line[1:]):
+        d = b - a
+        t = 0 if d == 0 else min(max(((p - a) * d.conjugate()).real / abs(d) ** 2, 0), 1)
+        dist.append(abs(a + t * d - p))
+    return min(dist)
+
+
+@pytest.fixture
+def vector_data():
+    rng = np.random.default_rng(0)
+    vd = vpype.VectorData()
+    for lid in (1, 3):
+        lines = []
+        for _ in range(300):
+            n = rng.integers(1, 8)
+            lines.append(rng.uniform(0, 100, n) + 1j * rng.uniform(0, 100, n))
+        # long hatch lines across the page
+        for t in rng.uniform(-100, 100, 100):
+            lines.append(np.array([t, t + 100 + 100j]))
+        vd.add(vpype.LineCollection(lines), lid)
+    return vd
+
+
+def _paths(vd):
+    return [((lid, i), line) for lid, lc in vd.layers.items() for i, line in enumerate(lc)]
+
+
+def test_nearest_matches_brute_force(vector_data):
+    index = PathIndex(vector_data)
+    paths = _paths(vector_data)
+    rng = np.random.default_rng(1)
+    for x, y in rng.uniform(-10, 110, (200, 2)):
+        radius = 2.0
+        dist = {key: _segment_distance(line, complex(x, y)) for key, line in paths}
+        key = index.nearest(x, y, radius)
+        if min(dist.values()) > radius:
+            assert key is None
+        else:
+            assert dist[key] == pytest.approx(min(dist.values()))
+
+
+def test_nearest_accept(vector_data):
+    index = PathIndex(vector_data)
+    rng = np.random.default_rng(2)
+    for x, y in rng.uniform(0, 100, (50, 2)):
+        key = index.nearest(x, y, 5.0, accept=lambda k: k[0] == 3)
+        assert key is None or key[0] == 3
+
+
+def test_inside_matches_brute_force(vector_data):
+    index = PathIndex(vector_data)
+    polygon = np.array([[10, 10], [80, 20], [60, 90], [20, 70]])
+    path = Path(polygon)
+    expected = {
+        key
+        for key, line in _paths(vector_data)
+        if path.contains_points(np.vstack([line.real, line.imag]).T).all()
+    }
+    assert set(index.inside(polygon)) == expected
+    assert len(expected) > 0
+
+
+def test_empty():
+    index = PathIndex(vpype.VectorData())
+    assert len(index) == 0
+    assert index.nearest(0, 0, 1) is None
+    assert index.inside(np.array([[0, 0], [1, 0], [1, 1]])) == []
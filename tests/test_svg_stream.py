@@ -0,0 +1,130 @@
+import numpy as np
+import pytest
+import vpype
+
+from axigui.svg_stream import iter_svg_batches
+
+SAMPLE_SVG = """<?xml version="1.0"?>
+<svg xmlns="http://www.w3.org/2000/svg"
+    xmlns:inkscape="http://www.inkscape.org/namespaces/inkscape"
+    width="200mm" height="100mm" viewBox="0 0 400 200">
+  <path d="M 10 10 L 50 10 L 50 40"/>
+  <g inkscape:label="Layer 3" id="layer7">
+    <path d="M 20 20 C 40 0 80 60 100 20 Q 120 0 140 20"/>
+    <g transform="scale(0.1)"><circle cx="1000" cy="1000" r="300"/></g>
+  </g>
+  <g id="layer2" transform="translate(10 5) rotate(30)">
+    <rect x="10" y="10" width="30" height="20"/>
+    <path d="M 100 100 A 30 20 0 1 1 160 100"/>
+  </g>
+  <g>
+    <line x1="0" y1="150" x2="500" y2="150"/>
+    <ellipse cx="300" cy="100" rx="40" ry="20"/>
+  </g>
+  <g inkscape:label="0"><path d="M 300 150 l 20 0 l 0 20 z"/></g>
+  <defs><path d="M 0 0 L 10 10"/></defs>
+</svg>
+"""
+
+REFERENCES_SVG = """<?xml version="1.0"?>
+<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
+    width="400" height="300" viewBox="0 0 400 300">
+  <defs>
+    <g id="card">
+      <path d="M 0 0 C 10 -20 30 20 40 0"/>
+      <rect x="0" y="5" width="40" height="20" rx="5"/>
+    </g>
+    <symbol id="mark"><circle cx="5" cy="5" r="4"/></symbol>
+  </defs>
+  <g id="layer1">
+    <use xlink:href="#card" x="100" y="50"/>
+    <use href="#card" transform="translate(200 50) rotate(30)"/>
+    <use xlink:href="#mark" x="300" y="10"/>
+  </g>
+  <g id="layer2">
+    <svg x="50" y="150" width="100" height="50" viewBox="0 0 10 10">
+      <path d="M 0 0 L 10 10 M 0 10 A 5 5 0 0 1 10 10"/>
+    </svg>
+    <rect x="200" y="150" width="100" height="60" rx="15" ry="40"/>
+    <rect x="200" y="220" width="100" height="60" ry="10"/>
+  </g>
+</svg>
+"""
+
+QUANTIZATION = 0.1
+
+
+def _path(tmp_path, svg: str) -> str:
+    path = tmp_path / "sample.svg"
+    path.write_text(svg)
+    return str(path)
+
+
+@pytest.fixture
+def sample_path(tmp_path):
+    return _path(tmp_path, SAMPLE_SVG)
+
+
+def _read(path: str, quantization: float) -> vpype.VectorData:
+    vd = vpype.VectorData()
+    for layer_id, lines in iter_svg_batches(path, quantization):
+        vd.add(lines, layer_id)
+    return vd
+
+
+@pytest.mark.parametrize("svg", [SAMPLE_SVG, REFERENCES_SVG], ids=["sample", "references"])
+def test_matches_vpype(tmp_path, svg):
+    path = _path(tmp_path, svg)
+    streamed = _read(path, QUANTIZATION)
+    expected = vpype.read_multilayer_svg(path, QUANTIZATION)
+
+    assert list(streamed.layers) == list(expected.layers)
+    for lid, lc in expected.layers.items():
+        assert len(streamed.layers[lid]) == len(lc)
+        for line, expected_line in zip(streamed.layers[lid], lc):
+            # curves are flattened differently, but to the same tolerance and into about as
+            # many segments
+            np.testing.assert_allclose(line[[0, -1]], expected_line[[0, -1]], atol=1e-3)
+            for func in (np.min, np.max):
+                assert func(line.real) == pytest.approx(func(expected_line.real), abs=0.1)
+                assert func(line.imag) == pytest.approx(func(expected_line.imag), abs=0.1)
+            assert len(line) == pytest.approx(len(expected_line), rel=0.05, abs=1)
+
+
+def test_vertex_count(sample_path):
+    streamed = _read(sample_path, QUANTIZATION)
+    expected = vpype.read_multilayer_svg(sample_path, QUANTIZATION)
+    count = sum(len(line) for lc in streamed.layers.values() for line in lc)
+    expected_count = sum(len(line) for lc in expected.layers.values() for line in lc)
+    assert count == pytest.approx(expected_count, rel=0.05)
+
+
+def test_forward_reference_ignored(tmp_path):
+    path = _path(
+        tmp_path,
+        """<svg xmlns="http://www.w3.org/2000/svg" width="100" height="100">
+          <use href="#later"/>
+          <use href="#missing"/>
+          <defs><path id="later" d="M 0 0 L 10 10"/></defs>
+          <use href="#later" x="20"/>
+        </svg>""",
+    )
+    lines = list(_read(path, QUANTIZATION).layers[1])
+    assert len(lines) == 1
+    np.testing.assert_allclose(lines[0], [20, 30 + 10j])
+
+
+def test_tolerance_applies_after_transform(sample_path):
+    streamed = _read(sample_path, QUANTIZATION)
+
+    # the circle is defined in a group scaled down by 10
+    circle = streamed.layers[3][1]
+    assert np.abs(np.diff(circle)).max() <= QUANTIZATION * 1.01
+
+
+def test_batches(sample_path):
+    batches = list(iter_svg_batches(sample_path, QUANTIZATION, batch_size=1))
+    vd = _read(sample_path, QUANTIZATION)
+    assert len(batches) > len(vd.layers)
+    for lid, lc in vd.layers.items():
+        assert sum(len(lines) for batch_lid, lines in batches if batch_lid == lid) == len(lc)